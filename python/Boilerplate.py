@@ -0,0 +1,61 @@
+"""
+Remove boilerplate text units (wire service footers, image credits, recurring teasers) which the hand-written
+drop_words and splitting strings miss: every normalized sentence or paragraph is hashed, the number of articles a
+hash occurs in is counted with a count-min sketch (bounded memory), only candidates above the threshold are counted
+exactly in a second pass, units occurring in at least min_articles articles are dropped
+"""
+import re
+import numpy
+import pandas
+from python.FingerprintIndex import Fingerprint
+from python.StreamingVocabulary import CountMinSketch
+
+digits = re.compile(r'\d+')
+
+
+def UnitKeys(texts):
+    """
+    64-bit fingerprints of text units, normalized like FingerprintIndex.NormalizeText() and without digits (dates,
+    page numbers and years in otherwise identical footers)
+    """
+    return numpy.fromiter((Fingerprint(digits.sub(' ', text)) for text in texts), dtype=numpy.uint64,
+                          count=len(texts))
+
+
+def FindBoilerplate(units, min_articles=20, min_chars=20, width=2 ** 20, depth=4):
+    """
+    units: TextUnits (python.TextUnits); returns mask of boilerplate units and report (dataframe with text, number of
+    articles and units, sorted by number of articles); units shorter than min_chars are never dropped
+    """
+    keys = UnitKeys(units.text)
+    eligible = numpy.fromiter((len(text.strip()) >= min_chars for text in units.text), dtype=bool, count=len(units))
+
+    # first pass: estimate in how many articles each key occurs
+    sketch = CountMinSketch(width, depth)
+    for i in range(len(units.article_ids)):
+        article_keys = keys[units.offsets[i]:units.offsets[i + 1]][eligible[units.offsets[i]:units.offsets[i + 1]]]
+        if len(article_keys):
+            sketch.Add(numpy.unique(article_keys))
+    candidates = eligible & (sketch.Estimate(keys) >= min_articles)
+
+    # second pass: exact article counts of the candidates
+    candidate_units = pandas.DataFrame({'key': keys[candidates], 'article_id': units.article_id[candidates]})
+    counts = candidate_units.groupby('key')['article_id'].agg(['nunique', 'size'])
+    boilerplate = counts.index[counts['nunique'] >= min_articles].to_numpy(dtype=numpy.uint64)
+    mask = candidates & numpy.isin(keys, boilerplate)
+
+    # report: one example text per removed key
+    first = pandas.Series(numpy.flatnonzero(mask)).groupby(keys[mask]).first()
+    report = pandas.DataFrame({'Text': [units.text[i] for i in first.to_numpy()],
+                               'Articles': counts.loc[first.index, 'nunique'].to_numpy(),
+                               'Units': counts.loc[first.index, 'size'].to_numpy()})
+    return mask, report.sort_values('Articles', ascending=False).reset_index(drop=True)
+
+
+def RemoveBoilerplate(units, min_articles=20, min_chars=20, width=2 ** 20, depth=4):
+    """
+    drop boilerplate units from TextUnits, returns the remaining units and the removal report
+    """
+    mask, report = FindBoilerplate(units, min_articles, min_chars, width, depth)
+    print('removed {} boilerplate units ({} distinct texts)'.format(int(mask.sum()), len(report)))
+    return units.Filter(~mask), report
@@ -0,0 +1,114 @@
+"""
+Cache of POS tagged documents: the spaCy docs of each article are stored in DocBin shards (one folder per model name,
+version and pipeline), so changing the POS filter or the lemma rules only reruns the cheap projection (ProjectTokens)
+on the cached docs instead of tagging every article again with de_core_news_md
+"""
+import os, json, hashlib
+from collections import OrderedDict
+from spacy.tokens import DocBin
+
+# token attributes stored per doc (no parser in nlp2, sentence boundaries come from the sentencizer)
+doc_attrs = ('ORTH', 'TAG', 'POS', 'LEMMA', 'SENT_START')
+
+
+def TextDigest(texts):
+    """
+    digest of the texts of an article, cached docs are only reused if the preprocessed text is unchanged
+    """
+    return hashlib.blake2b('\x00'.join(texts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class DocBinCache:
+    """
+    tagged docs keyed by article ID in path/<lang>_<model>-<version>-<pipes>/shard-%05d.spacy plus index.json
+    ({article_id: [shard, start, count, digest]}); retagged articles leave their old docs unused in older shards
+    """
+
+    def __init__(self, path, nlp, shard_size=5000, attrs=doc_attrs, max_loaded=2):
+        meta = nlp.meta
+        self.nlp, self.shard_size, self.attrs, self.max_loaded = nlp, shard_size, list(attrs), max_loaded
+        self.path = os.path.join(path, '{}_{}-{}-{}'.format(meta.get('lang', ''), meta.get('name', ''),
+                                                            meta.get('version', ''), '+'.join(nlp.pipe_names)))
+        os.makedirs(self.path, exist_ok=True)
+        self.index_file = os.path.join(self.path, 'index.json')
+        self.index, self.num_shards = {}, 0
+        if os.path.isfile(self.index_file):
+            with open(self.index_file) as f:
+                state = json.load(f)
+            self.index, self.num_shards = state['articles'], state['shards']
+        self.pending, self.pending_count = DocBin(attrs=self.attrs), 0
+        self.loaded = OrderedDict()
+        self.hits, self.misses = 0, 0
+
+    def ShardFile(self, shard):
+        return os.path.join(self.path, 'shard-%05d.spacy' % shard)
+
+    def _Shard(self, shard):
+        """
+        docs of a shard, the last max_loaded shards are kept in memory
+        """
+        if shard not in self.loaded:
+            with open(self.ShardFile(shard), 'rb') as f:
+                docbin = DocBin().from_bytes(f.read())
+            self.loaded[shard] = list(docbin.get_docs(self.nlp.vocab))
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.popitem(last=False)
+        self.loaded.move_to_end(shard)
+        return self.loaded[shard]
+
+    def Lookup(self, article_id, texts):
+        """
+        cached docs of an article, None if not cached, not flushed yet or the texts changed
+        """
+        entry = self.index.get(str(article_id))
+        if entry is None or entry[0] >= self.num_shards or entry[3] != TextDigest(texts):
+            return None
+        shard, start, count, _ = entry
+        return self._Shard(shard)[start:start + count]
+
+    def Store(self, article_id, texts, docs):
+        for doc in docs:
+            self.pending.add(doc)
+        self.index[str(article_id)] = [self.num_shards, self.pending_count, len(docs), TextDigest(texts)]
+        self.pending_count += len(docs)
+        if self.pending_count >= self.shard_size:
+            self.Flush()
+
+    def Flush(self):
+        """
+        write pending docs as a new shard and the index (atomically)
+        """
+        if self.pending_count == 0:
+            return
+        with open(self.ShardFile(self.num_shards), 'wb') as f:
+            f.write(self.pending.to_bytes())
+        self.num_shards += 1
+        self.pending, self.pending_count = DocBin(attrs=self.attrs), 0
+        with open(self.index_file + '.tmp', 'w') as f:
+            json.dump({'shards': self.num_shards, 'articles': self.index}, f)
+        os.replace(self.index_file + '.tmp', self.index_file)
+
+    def Pipe(self, units, batch_size=1000):
+        """
+        tagged docs of all units of a TextUnits (python.TextUnits) in unit order, like nlp.pipe(units.text):
+        cached articles are read from the shards, the others are tagged in batches of about batch_size units and
+        added to the cache
+        """
+        start = 0
+        while start < len(units.article_ids):
+            end = start
+            while end < len(units.article_ids) and units.offsets[end] - units.offsets[start] < batch_size:
+                end += 1
+            texts = {a: units.text[units.offsets[i]:units.offsets[i + 1]]
+                     for i, a in zip(range(start, end), units.article_ids[start:end].tolist())}
+            docs = {a: self.Lookup(a, t) for a, t in texts.items()}
+            missing = [a for a, d in docs.items() if d is None]
+            self.hits, self.misses = self.hits + len(docs) - len(missing), self.misses + len(missing)
+            tagged = iter(self.nlp.pipe([t for a in missing for t in texts[a]]))
+            for a in missing:
+                docs[a] = [next(tagged) for _ in texts[a]]
+                self.Store(a, texts[a], docs[a])
+            for a in texts:
+                yield from docs[a]
+            start = end
+        self.Flush()
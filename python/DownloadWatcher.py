@@ -0,0 +1,93 @@
+"""
+Wait for a download to be completed: listens to file system events of the download folder (inotify, falls back to
+polling if inotify_simple is not installed or not supported), ignores partial downloads (.crdownload, .part, ...)
+and returns as soon as the archive is a valid ZIP or, for other files, its size is stable
+"""
+import os, time, zipfile
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+# suffixes of files which are still being downloaded (Chrome, Firefox, others)
+partial_suffixes = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+
+class DownloadWatcher:
+    """
+    watch directory for completed downloads; a file counts as complete if no partial download file of it exists and
+    it is a valid ZIP (ZIP files) or its size did not change for stable_time seconds (other files)
+    """
+
+    def __init__(self, directory, stable_time=1.0, poll_interval=0.5, use_inotify=True):
+        self.directory, self.stable_time, self.poll_interval = directory, stable_time, poll_interval
+        self._sizes = {}
+        self._inotify = None
+        if use_inotify and INotify is not None:
+            try:
+                self._inotify = INotify()
+                self._inotify.add_watch(directory, flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE |
+                                        flags.MOVED_TO | flags.DELETE | flags.MOVED_FROM)
+            except OSError:
+                self._inotify = None
+
+    def Close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def IsPartial(self, path):
+        return any(os.path.exists(path + suffix) for suffix in partial_suffixes)
+
+    def IsComplete(self, path):
+        """
+        check whether the download of path is complete (see class docstring)
+        """
+        if not os.path.isfile(path) or self.IsPartial(path):
+            return False
+        if path.lower().endswith('.zip'):
+            if not zipfile.is_zipfile(path):
+                return False
+            with zipfile.ZipFile(path) as archive:
+                return archive.testzip() is None
+        size, now = os.path.getsize(path), time.monotonic()
+        last_size, since = self._sizes.get(path, (None, now))
+        if size != last_size:
+            self._sizes[path] = (size, now)
+            return False
+        return now - since >= self.stable_time
+
+    def Wait(self, timeout):
+        """
+        block until a file system event arrives (or for timeout seconds when polling)
+        """
+        if self._inotify is not None:
+            self._inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    def WaitFor(self, filename, timeout=None, extensions=('.ZIP', '')):
+        """
+        wait until filename (with one of the extensions) is completely downloaded and return its path;
+        raises TimeoutError after timeout seconds (None waits forever)
+        """
+        paths = [os.path.join(self.directory, filename + extension) for extension in extensions]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for path in paths:
+                if self.IsComplete(path):
+                    self._sizes.pop(path, None)
+                    return path
+            wait = self.poll_interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError('{} not downloaded within {} seconds'.format(filename, timeout))
+            self.Wait(wait)
@@ -0,0 +1,67 @@
+"""
+Persistent index of 64-bit fingerprints of normalized article texts (with date) and headlines, to drop exact
+duplicates across separately ingested batches without keeping the texts in memory
+"""
+import os, re, hashlib
+import numpy
+
+p = re.compile(r'[\W_]+')
+
+
+def NormalizeText(string):
+    """
+    lower case, drop punctuation and special characters, collapse white space
+    """
+    return p.sub(' ', str(string).lower()).strip()
+
+
+def Fingerprint(*strings):
+    """
+    64-bit blake2b hash of the normalized strings
+    """
+    text = '\x00'.join(NormalizeText(s) for s in strings)
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class FingerprintIndex:
+    """
+    fingerprints of all ingested articles and headlines, stored as two uint64 .npy files in a folder and held as
+    sets for O(1) lookups
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.articles, self.headlines = set(), set()
+        for name in ('articles', 'headlines'):
+            filename = os.path.join(path, name + '.npy')
+            if os.path.isfile(filename):
+                getattr(self, name).update(numpy.load(filename).tolist())
+
+    def __len__(self):
+        return len(self.articles)
+
+    def Save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name in ('articles', 'headlines'):
+            filename = os.path.join(self.path, name + '.npy')
+            numpy.save(filename + '.tmp.npy', numpy.fromiter(getattr(self, name), dtype=numpy.uint64))
+            os.replace(filename + '.tmp.npy', filename)
+
+    def Deduplicate(self, articles, dates, headlines):
+        """
+        returns a list of booleans, True for articles which are neither in the index nor duplicates of an earlier
+        article in the same batch (same article text and date or same headline, like drop_duplicates() in the
+        preprocessing scripts); the kept articles are added to the index
+        """
+        keep = []
+        for article, date, headline in zip(articles, dates, headlines):
+            # dates as yyyy-mm-dd, no matter if date, datetime or pandas Timestamp
+            fp_article = Fingerprint(article, str(date)[:10])
+            fp_headline = Fingerprint(headline) if NormalizeText(headline) else None
+            new = fp_article not in self.articles and fp_headline not in self.headlines
+            if new:
+                self.articles.add(fp_article)
+                if fp_headline is not None:
+                    self.headlines.add(fp_headline)
+            keep.append(new)
+        return keep
@@ -6,13 +6,18 @@ This is a webscraper for Uni Nexis. It requires a log in and a predefined search
 Note that it is recommendable to keep the max. number of saved articles in the searchlink below 10k. This is less prone
 to errors, the exact number of scraped articles is known and the program jumps in a loop which duration is estimatable.
 However, the user can also scrape articles >10k which is then a while loop.
-Note, adjust timers (t1, t2) which measure the time in sec. to load pages, signing in, scrolling down, retrying page
-interactions etc. t1 is for short duration actions (e.g. scroll down), t2 for long (e.g. signing in).
+Page interactions wait for conditions (element present, page loaded, ...) and are retried with exponential backoff
+(see WaitPolicy), so the run time follows the actual page latency. Timers t1, t2 are the max. delays in sec. between
+two retries, t1 for short duration actions (e.g. scroll down), t2 for long (e.g. signing in).
 Set display_infos to True if you want to display status infos.
+Downloaded ranges are recorded in path_downloads/checkpoint.json; if the run crashes, just restart it.
 """
 
-import time, os
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from python.WaitPolicy import WaitPolicy
+from python.DownloadWatcher import DownloadWatcher
+from python.ScrapeCheckpoint import ScrapeCheckpoint, SkipCompleted, NextPage
 
 # load credentials
 from python.ConfigUser import nexis_user, nexis_pw, path_downloads, path_chromedriver, url_searchresults
@@ -23,24 +28,70 @@ driver.set_window_size(1024, 600)
 driver.maximize_window()
 url_signin = 'https://signin.lexisnexis.com/lnaccess/app/signin?back=https%3A%2F%2Fadvance.lexis.com%3A443%2Fnexis-uni&aci=nu'
 
-# waiting times
+# waiting times (max. delay between retries) and retry policy
 t1, t2 = 1.5, 3
+policy = WaitPolicy(max_delay=t2, exceptions=(WebDriverException,))
+
+# watch download folder for completed downloads
+watcher = DownloadWatcher(path_downloads)
+
+# checkpoint of downloaded ranges, a restarted run continues with the first missing range
+checkpoint = ScrapeCheckpoint(path_downloads + 'checkpoint.json', search=url_searchresults)
 
 # display info
 display_infos = True
 
 
-def try_click_by_xpath(xpath, t):
+def try_click_by_xpath(xpath, t=None):
+    """
+    enter xpath and timer, then this function tries to click the xpath, if not possible, retry with increasing
+    waiting times (at most t)
+    """
+    policy.Retry(lambda: driver.find_element_by_xpath(xpath).click(), action='click ' + xpath, max_delay=t)
+
+
+def wait_for_text(xpath, t=None):
+    """
+    wait until the element of xpath is on the page and has a text, return the text
+    """
+    return policy.Until(lambda: driver.find_element_by_xpath(xpath).text, action='text ' + xpath, max_delay=t)
+
+
+def wait_for_page(t=None):
+    """
+    wait until the current page is loaded
+    """
+    policy.Until(lambda: driver.execute_script('return document.readyState') == 'complete', action='page load',
+                 max_delay=t)
+
+
+def scroll_down():
     """
-    enter xpath and timer, then this function tries to click the xpath, if not possible, wait time
+    scroll down to the 'Next Page' Button '>' and wait until the page is scrolled to the bottom
     """
-    TrytoclickFlag = False
-    while TrytoclickFlag is False:
-        try:
-            driver.find_element_by_xpath(xpath).click()
-            TrytoclickFlag = True
-        except:
-            time.sleep(t)
+    driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+    policy.Until(lambda: driver.execute_script(
+        'return window.innerHeight + window.pageYOffset >= document.body.scrollHeight - 1'), action='scroll down',
+        max_delay=t1)
+
+
+def click_next_page(t=None):
+    """
+    click the 'Next Page' Button '>' (retried until it is clickable) and wait until the next result page replaced the
+    current one, see ScrapeCheckpoint.NextPage; returns False if there is no 'Next Page' Button (last page)
+    """
+    return NextPage(driver, policy, max_delay=t)
+
+
+def set_filename(filename):
+    """
+    set filename 'Basis-Optionen' > Dateiname and wait until the input field contains it
+    """
+    xpath = '/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input'
+    policy.Retry(lambda: driver.find_element_by_xpath(xpath).clear(), action='clear filename', max_delay=t1)
+    policy.Retry(lambda: driver.find_element_by_xpath(xpath).send_keys(filename), action='type filename', max_delay=t1)
+    policy.Until(lambda: driver.find_element_by_xpath(xpath).get_attribute('value') == filename,
+                 action='filename set', max_delay=t1)
 
 
 """
@@ -49,11 +100,12 @@ Start of web scraping
 
 # open website
 driver.get(url_signin)
-time.sleep(t1)
 
 # log in
 if display_infos: print('logging in')
-login_user_input = driver.find_element_by_xpath('/html/body/main/section/section/form/ul/div/li[1]/label/div/input')
+login_user_input = policy.Until(
+    lambda: driver.find_element_by_xpath('/html/body/main/section/section/form/ul/div/li[1]/label/div/input'),
+    action='sign in page', max_delay=t1)
 login_user_input.send_keys(nexis_user)
 login_pw_input = driver.find_element_by_xpath('/html/body/main/section/section/form/ul/div/li[2]/label/div/input')
 login_pw_input.send_keys(nexis_pw)
@@ -61,13 +113,12 @@ login_pw_input.send_keys(nexis_pw)
 driver.find_element_by_xpath('/html/body/main/section/section/form/ul/div/li[3]/div/input[1]').submit()
 
 # wait for page, open 'Link zu dieser Seite', click 'Weiter'
-time.sleep(t2)
+policy.Until(lambda: 'signin' not in driver.current_url, action='signing in', max_delay=t2)
 if display_infos: print('opening search page')
 driver.get(url_searchresults)
-driver.find_element_by_xpath('/html/body/main/div/div[16]/div/div/div/section/div/menu/input[1]').click()
-time.sleep(t2)
+try_click_by_xpath('/html/body/main/div/div[16]/div/div/div/section/div/menu/input[1]', t=t2)
 
-number_articles_raw = driver.find_element_by_xpath('/html/body/main/div/main/div[2]/div/div[2]/header/h2/span').text
+number_articles_raw = wait_for_text('/html/body/main/div/main/div[2]/div/div[2]/header/h2/span', t=t2)
 number_articles_raw = number_articles_raw.replace('News (', '').replace(')', '').replace(' ', '').replace('+','').replace('.', '')
 number_articles = int(number_articles_raw)
 if display_infos: print(number_articles)
@@ -81,11 +132,13 @@ if display_infos: print(number_articles)
 Regular loop over fixed number of articles if number_articles contains a number <10k. Else, do a while loop (below)
 """
 if number_articles < 10000:
-    k = 1
-    last_download = False
+    # skip the result pages of ranges downloaded in an earlier run
+    k = SkipCompleted(driver, checkpoint, policy)
+    last_download, options_set = False, False
+    if display_infos and k > 1: print('resuming at file {}'.format(k))
 
     ### Loop over page results, click checkboxes, define download options and download
-    for i in range(1, number_articles, 100):
+    for i in range(1 + 100 * (k - 1), number_articles, 100):
 
         # set counters
         p1, p2 = i, i + 99
@@ -100,10 +153,8 @@ if number_articles < 10000:
         try_click_by_xpath(xpath='/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[1]/input',
                            t=t2)
 
-        # scroll down and wait for the 'Next Page' Button '>' being clickable
-        time.sleep(t1)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(t1)
+        # scroll down to the 'Next Page' Button '>'
+        scroll_down()
 
         if number_articles - i <= 50:
 
@@ -120,7 +171,8 @@ if number_articles < 10000:
         elif 50 < number_articles - i <= 100:
 
             # find button with triangle: > (next-page button) and click it
-            driver.find_element_by_xpath('//a[@class="icon la-TriangleRight action"]').click()
+            if not click_next_page(t2):
+                raise RuntimeError('no result page after {}'.format(i + 49))
 
             # click download
             try_click_by_xpath(
@@ -135,7 +187,8 @@ if number_articles < 10000:
         else:
 
             # find button with triangle: > (next-page button) and click it
-            driver.find_element_by_xpath('//a[@class="icon la-TriangleRight action"]').click()
+            if not click_next_page(t2):
+                raise RuntimeError('no result page after {}'.format(i + 49))
 
             # click checkbox for part 2 e.g. 51-100
             if display_infos: print('page {}-{}'.format(i + 49, i + 99))
@@ -149,7 +202,7 @@ if number_articles < 10000:
 
         ### Download options (need to be set up only in the first instance)
         ## 'Basis-Optionen'
-        if i == 1:
+        if not options_set:
             if display_infos: print('selecting options "Basis-Optionen"')
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[1]/ul/li[2]/a', t=t1)
 
@@ -163,35 +216,25 @@ if number_articles < 10000:
 
         # Set filename 'Basis-Optionen' > Dateiname
         try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input', t=t1)
-        time.sleep(t1)
-        driver.find_element_by_xpath('/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').clear()
-        time.sleep(t1)
-        driver.find_element_by_xpath(
-            '/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').send_keys(tempfile)
-        time.sleep(t1)
+        set_filename(tempfile)
 
         ## 'Layout-Optionen'
-        if i == 1:
+        if not options_set:
             if display_infos: print('selecting options "Layout-Optionen"')
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[1]/ul/li[3]/a', t=t1)
             # click 'Eingebettete Referenzen als Links' to uncheck checkbox
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[2]/div[3]/section/div[1]/fieldset/div[5]/input',
                                t=t1)
+            options_set = True
 
         ## Click 'Herunterladen' to download
         if display_infos: print('downloading')
         try_click_by_xpath(xpath='/html/body/aside/footer/div/button[1]', t=t1)
 
-        # wait, check whether files were downloaded, if not, wait more
-        DownloadedFlag = False
-        while DownloadedFlag is False:
-            time.sleep(t2)
-            if os.path.isfile(path_downloads + tempfile + '.ZIP') or os.path.isfile(path_downloads + tempfile):
-                if display_infos: print('file {} downloaded'.format(tempfile + '.ZIP'))
-                DownloadedFlag = True
-                time.sleep(t2)  # wait in case file is still downloading
-            else:
-                if display_infos: print('file {} not downloaded, yet. waiting more'.format(tempfile + '.ZIP'))
+        # wait until the file is completely downloaded (file system events, see DownloadWatcher)
+        downloaded_file = watcher.WaitFor(tempfile)
+        if display_infos: print('file {} downloaded'.format(downloaded_file))
+        checkpoint.MarkCompleted(k, p1, p2, downloaded_file)
 
         # close Downloading Windows and switch back to search results
         default_handle = driver.current_window_handle
@@ -202,20 +245,20 @@ if number_articles < 10000:
         driver.switch_to.window(handles[0])
         driver.close()
         driver.switch_to.window(default_handle)
-        time.sleep(t2)
+        wait_for_page(t2)
 
         # if very last page reached
         if last_download is True:
             if display_infos: print('last page reached, closing driver')
             driver.quit()
+            break
 
-        # scroll down and wait for the 'Next Page' Button '>' being clickable
-        time.sleep(t1)
-        driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-        time.sleep(t1)
+        # scroll down to the 'Next Page' Button '>'
+        scroll_down()
 
         # find button with triangle: > (next-page button) and click it
-        driver.find_element_by_xpath('//a[@class="icon la-TriangleRight action"]').click()
+        if not click_next_page(t2):
+            raise RuntimeError('no result page after {}'.format(i + 99))
 
         k += 1
 
@@ -225,11 +268,14 @@ While loop over of undetermined number of articles if number_articles contains a
 """
 
 if number_articles == 10000:
-    k, i = 1, 1
-    next_page_clickable, last_page_50th, last_page_100th = True, False, False
+    # skip the result pages of ranges downloaded in an earlier run
+    k = SkipCompleted(driver, checkpoint, policy)
+    i, options_set = 1 + 100 * (k - 1), False
+    if display_infos and k > 1: print('resuming at file {}'.format(k))
+    next_page_exists, last_page_50th, last_page_100th = True, False, False
 
-    ### While Loop over page results, continue scraping if 'Next Page >' is clickable
-    while next_page_clickable:
+    ### While Loop over page results, continue scraping as long as there is a 'Next Page >' button
+    while next_page_exists:
 
         # set counters
         p1, p2 = i, i + 99
@@ -244,39 +290,29 @@ if number_articles == 10000:
                            t=t2)
 
         # Get the number of selected pages
-        time.sleep(t1)
-        pg1 = driver.find_element_by_xpath('/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[2]/div/button/span[1]').text
-        time.sleep(t1)
-        pg1 = int(pg1)
-
-        # scroll down and wait for the 'Next Page' Button '>' being clickable
-        time.sleep(t1)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(t1)
-
-        ## try to click the 'Next Page' Button '>', if not available, we are on the last page
-        try:
-            if display_infos: print('page {}-{}'.format(i, i+pg1-1))
-            # find button with triangle: > (next-page button) and click it
-            driver.find_element_by_xpath('//a[@class="icon la-TriangleRight action"]').click()
-            if display_infos: print('going to next page')
-        except:
-            next_page_clickable = False
+        pg1 = int(wait_for_text(
+            '/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[2]/div/button/span[1]', t=t1))
+
+        # scroll down to the 'Next Page' Button '>'
+        scroll_down()
+
+        ## click the 'Next Page' Button '>', if there is none, we are on the last page
+        if display_infos: print('page {}-{}'.format(i, i+pg1-1))
+        if not click_next_page(t2):
+            next_page_exists = False
             if display_infos: print('last page reached')
             last_page_50th = True
             # end while loop
             continue
+        if display_infos: print('going to next page')
 
         # click checkbox for part 2 e.g. 51-100
         try_click_by_xpath(xpath='/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[1]/input',
                            t=t1)
 
         # Get the number of selected pages
-        time.sleep(t1)
-        pg2 = driver.find_element_by_xpath(
-            '/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[2]/div/button/span[1]').text
-        time.sleep(t1)
-        pg2 = int(pg2)
+        pg2 = int(wait_for_text(
+            '/html/body/main/div/main/div[2]/div/div[2]/div[2]/form/div[1]/div/ul[1]/li[2]/div/button/span[1]', t=t1))
 
         # click download
         if display_infos: print('page {}-{}'.format(i+pg1-1, i+pg2-1))
@@ -288,7 +324,7 @@ if number_articles == 10000:
 
         ### Download options (need to be set up only in the first instance)
         ## 'Basis-Optionen'
-        if i == 1:
+        if not options_set:
             if display_infos: print('selecting options "Basis-Optionen"')
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[1]/ul/li[2]/a', t=t1)
 
@@ -302,35 +338,25 @@ if number_articles == 10000:
 
         # Set filename 'Basis-Optionen' > Dateiname
         try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input', t=t1)
-        time.sleep(t1)
-        driver.find_element_by_xpath('/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').clear()
-        time.sleep(t1)
-        driver.find_element_by_xpath(
-            '/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').send_keys(tempfile)
-        time.sleep(t1)
+        set_filename(tempfile)
 
         ## 'Layout-Optionen'
-        if i == 1:
+        if not options_set:
             if display_infos: print('selecting options "Layout-Optionen"')
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[1]/ul/li[3]/a', t=t1)
             # click 'Eingebettete Referenzen als Links' to uncheck checkbox
             try_click_by_xpath(xpath='/html/body/aside/form/div[4]/div[2]/div[3]/section/div[1]/fieldset/div[5]/input',
                                t=t1)
+            options_set = True
 
         ## Click 'Herunterladen' to download
         if display_infos: print('downloading')
         try_click_by_xpath(xpath='/html/body/aside/footer/div/button[1]', t=t1)
 
-        # wait, check whether files were downloaded, if not, wait more
-        DownloadedFlag = False
-        while DownloadedFlag is False:
-            time.sleep(t2)
-            if os.path.isfile(path_downloads + tempfile + '.ZIP') or os.path.isfile(path_downloads + tempfile):
-                if display_infos: print('file {} downloaded'.format(tempfile + '.ZIP'))
-                DownloadedFlag = True
-                time.sleep(t2)  # wait in case file is still downloading
-            else:
-                if display_infos: print('file {} not downloaded, yet. waiting more'.format(tempfile + '.ZIP'))
+        # wait until the file is completely downloaded (file system events, see DownloadWatcher)
+        downloaded_file = watcher.WaitFor(tempfile)
+        if display_infos: print('file {} downloaded'.format(downloaded_file))
+        checkpoint.MarkCompleted(k, p1, p2, downloaded_file)
 
         # close Downloading Windows and switch back to search results
         default_handle = driver.current_window_handle
@@ -341,22 +367,18 @@ if number_articles == 10000:
         driver.switch_to.window(handles[0])
         driver.close()
         driver.switch_to.window(default_handle)
-        time.sleep(t2)
-
-        # scroll down and wait for the 'Next Page' Button '>' being clickable
-        time.sleep(t1)
-        driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-        time.sleep(t1)
-
-        ## try to click the 'Next Page' Button '>', if not available, this was the last page
-        try:
-            driver.find_element_by_xpath('//a[@class="icon la-TriangleRight action"]').click()
-            if display_infos: print('going to next page')
-        except:
-            next_page_clickable = False
+        wait_for_page(t2)
+
+        # scroll down to the 'Next Page' Button '>'
+        scroll_down()
+
+        ## click the 'Next Page' Button '>', if there is none, this was the last page
+        if not click_next_page(t2):
+            next_page_exists = False
             if display_infos: print('last page reached')
             # end while loop
             continue
+        if display_infos: print('going to next page')
 
         k += 1
         i += 100
@@ -377,14 +399,12 @@ if number_articles == 10000:
         tempfile = '{}_file_{}_{}'.format(k, i, i+pg1-1)
         if display_infos: print('downloading last file {}'.format(tempfile))
 
-        time.sleep(t1)
-        driver.find_element_by_xpath('/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').clear()
-        time.sleep(t1)
-        driver.find_element_by_xpath(
-            '/html/body/aside/form/div[4]/div[2]/div[2]/section/fieldset[6]/div/input').send_keys(tempfile)
-        time.sleep(t1)
+        set_filename(tempfile)
 
     if display_infos: print('closing driver')
     driver.quit()
 
     print('DONE!')
+
+# timing statistics per page action
+if display_infos: print(policy.Report())
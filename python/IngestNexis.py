@@ -0,0 +1,288 @@
+"""
+Read the downloaded Nexis Uni ZIP/DOCX files directly in python (replaces R/ProcessNexisArticles.R):
+archives are parsed in parallel, filtered on Publication-Type and streamed as feather shards into the articles and
+paragraphs datasets which are read in by the preprocessing scripts (see ReadDataset). A manifest of processed
+archives makes repeated runs parse only newly downloaded files, a fingerprint index (FingerprintIndex.py) drops
+duplicates of articles from earlier batches.
+"""
+import io, os, re, glob, json, zipfile, hashlib, datetime, collections
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+import pandas
+import pyarrow
+import pyarrow.dataset
+import pyarrow.feather
+from python.FingerprintIndex import FingerprintIndex
+
+# namespace of the main part of a docx (word/document.xml)
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# lines which end the article body in Nexis Uni documents
+body_end = ('Classification', 'Load-Date:', 'End of Document')
+
+months = {'januar': 1, 'january': 1, 'februar': 2, 'february': 2, 'märz': 3, 'march': 3, 'april': 4, 'mai': 5,
+          'may': 5, 'juni': 6, 'june': 6, 'juli': 7, 'july': 7, 'august': 8, 'september': 9, 'oktober': 10,
+          'october': 10, 'november': 11, 'dezember': 12, 'december': 12}
+
+# columns of the exported datasets (same as in R/ProcessNexisArticles.R)
+cols = ['Source_File', 'Newspaper', 'Date', 'Length', 'Headline']
+article_cols = ['ID', 'Article'] + cols
+paragraph_cols = ['Art_ID', 'Par_ID', 'Paragraph'] + cols
+
+
+def ReadDocx(data):
+    """
+    read the paragraphs (non-empty, stripped) of a docx given as bytes or file path
+    """
+    with zipfile.ZipFile(data if isinstance(data, str) else io.BytesIO(data)) as docx:
+        root = ET.fromstring(docx.read('word/document.xml'))
+    paragraphs = []
+    for par in root.iter(W + 'p'):
+        text = []
+        for node in par.iter():
+            if node.tag == W + 't' and node.text:
+                text.append(node.text)
+            elif node.tag == W + 'tab':
+                text.append('\t')
+            elif node.tag in (W + 'br', W + 'cr'):
+                text.append('\n')
+        text = ''.join(text).strip()
+        if text:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def ParseDate(string):
+    """
+    parse dates like '1. April 2019 Montag' or 'April 1, 2019 Monday', returns None if no date found
+    """
+    string = string.lower()
+    match = re.search(r'(\d{1,2})\.?\s+([a-zä]+)\s+(\d{4})', string)
+    if match and match.group(2) in months:
+        day, month, year = int(match.group(1)), months[match.group(2)], int(match.group(3))
+    else:
+        match = re.search(r'([a-zä]+)\s+(\d{1,2}),?\s+(\d{4})', string)
+        if not (match and match.group(1) in months):
+            return None
+        day, month, year = int(match.group(2)), months[match.group(1)], int(match.group(3))
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def ParseNexisArticle(paragraphs, source_file=''):
+    """
+    split the paragraphs of a Nexis Uni document into meta data and body;
+    layout: headline, newspaper, date, meta lines (Length: ...), 'Body', paragraphs, 'Classification', meta lines
+    """
+    if 'Body' not in paragraphs:
+        return None
+    start = paragraphs.index('Body')
+    end = next((i for i in range(start + 1, len(paragraphs)) if paragraphs[i].startswith(body_end)),
+               len(paragraphs))
+    header, body, footer = paragraphs[:start], paragraphs[start + 1:end], paragraphs[end:]
+    meta = {line.split(':', 1)[0]: line.split(':', 1)[1].strip() for line in header + footer if ':' in line}
+    date = next((d for d in map(ParseDate, header[1:4]) if d is not None), None)
+    return {'Source_File': source_file,
+            'Newspaper': header[1] if len(header) > 1 else '',
+            'Date': date,
+            'Length': meta.get('Length', ''),
+            'Headline': header[0] if header else '',
+            'Publication_Type': meta.get('Publication-Type', ''),
+            'Paragraphs': body}
+
+
+def ReadArchive(path, publication_type='Zeitung'):
+    """
+    parse all articles of a downloaded ZIP (or a single DOCX), keep only the given Publication-Type
+    (None keeps all); returns a list of dicts from ParseNexisArticle()
+    """
+    if path.lower().endswith('.docx'):
+        documents = [(os.path.basename(path), ReadDocx(path))]
+    else:
+        with zipfile.ZipFile(path) as archive:
+            documents = [(name, ReadDocx(archive.read(name))) for name in sorted(archive.namelist())
+                         if name.lower().endswith('.docx')]
+    articles = []
+    for name, paragraphs in documents:
+        article = ParseNexisArticle(paragraphs, source_file=name)
+        if article is None:
+            continue
+        if publication_type is None or publication_type in article['Publication_Type']:
+            articles.append(article)
+    return articles
+
+
+def WriteShard(df, path_dataset):
+    """
+    write a dataframe as next feather shard (part-00000.feather, part-00001.feather, ...) of a dataset folder
+    """
+    os.makedirs(path_dataset, exist_ok=True)
+    shard = len(glob.glob(os.path.join(path_dataset, 'part-*.feather')))
+    filename = os.path.join(path_dataset, 'part-{:05d}.feather'.format(shard))
+    pyarrow.feather.write_feather(pyarrow.Table.from_pandas(df, preserve_index=False), filename)
+    return filename
+
+
+def ReadDataset(path, columns=None):
+    """
+    read a dataset folder of feather shards (IngestNexis) or a single feather file (R/ProcessNexisArticles.R)
+    """
+    if not os.path.isdir(path) and os.path.isfile(path + '.feather'):
+        path = path + '.feather'
+    return pyarrow.dataset.dataset(path, format='feather').to_table(columns=columns).to_pandas()
+
+
+def ArticlesToFrames(articles, first_id):
+    """
+    convert parsed articles to the articles and paragraphs dataframes, ids start with first_id
+    """
+    article_rows, paragraph_rows = [], []
+    for id, article in enumerate(articles, start=first_id):
+        meta = [article[c] for c in cols]
+        article_rows.append([id, '\n'.join(article['Paragraphs'])] + meta)
+        for par_id, paragraph in enumerate(article['Paragraphs'], start=1):
+            paragraph_rows.append([id, par_id, paragraph] + meta)
+    df_articles = pandas.DataFrame(article_rows, columns=article_cols)
+    df_paragraphs = pandas.DataFrame(paragraph_rows, columns=paragraph_cols)
+    for df in (df_articles, df_paragraphs):
+        df['Date'] = pandas.to_datetime(df['Date'])
+    return df_articles, df_paragraphs
+
+
+class IngestManifest:
+    """
+    json file recording the ingested archives by path, size and sha256 hash and the next free article id
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.next_id, self.archives, self._hashes = 1, {}, {}
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.next_id, self.archives = manifest['next_id'], manifest['archives']
+
+    def Save(self):
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'next_id': self.next_id, 'archives': self.archives}, f, indent=1)
+        os.replace(temp, self.path)
+
+    def Hash(self, path):
+        if path not in self._hashes:
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(block)
+            self._hashes[path] = sha256.hexdigest()
+        return self._hashes[path]
+
+    def NewArchives(self, paths):
+        """
+        return the archives which were not ingested yet; archives with known path and size are skipped without
+        hashing, renamed copies of ingested archives are recognised by their hash
+        """
+        hashes = {entry['sha256'] for entry in self.archives.values()}
+        new = []
+        for path in paths:
+            entry = self.archives.get(path)
+            if entry is not None and entry['size'] == os.path.getsize(path):
+                continue
+            if self.Hash(path) not in hashes:
+                new.append(path)
+        return new
+
+    def Add(self, path, articles):
+        self.archives[path] = {'size': os.path.getsize(path), 'sha256': self.Hash(path), 'articles': articles,
+                               'ingested': datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def ReadArchives(executor, paths, publication_type, max_pending):
+    """
+    (path, articles) of the archives in the order of paths, parsed by the executor; at most max_pending archives are
+    submitted and not yet consumed, so finished results do not pile up in memory behind a slow archive
+    """
+    paths, pending = iter(paths), collections.deque()
+    for path in paths:
+        pending.append((path, executor.submit(ReadArchive, path, publication_type)))
+        if len(pending) >= max_pending:
+            break
+    while pending:
+        path, future = pending.popleft()
+        next_path = next(paths, None)
+        if next_path is not None:
+            pending.append((next_path, executor.submit(ReadArchive, next_path, publication_type)))
+        yield path, future.result()
+
+
+def IngestNexis(paths, path_articles, path_paragraphs, publication_type='Zeitung', n_jobs=None, batchsize=5000,
+                first_id=1, manifest=None, fingerprints=None, max_pending=None):
+    """
+    parse archives in parallel (n_jobs processes) and append the articles in batches of batchsize articles as
+    shards to the articles and paragraphs datasets; returns the number of ingested articles. At most max_pending
+    archives (default 2 per process) are parsed ahead of the batch being filled.
+    If an IngestManifest is given, only new archives are parsed, ids continue after the last ingested article and
+    the manifest is saved after each written batch. If a FingerprintIndex is given, articles which duplicate any
+    earlier ingested article are dropped
+    """
+    if manifest is not None:
+        paths, first_id = manifest.NewArchives(paths), manifest.next_id
+    if max_pending is None:
+        max_pending = 2 * (n_jobs or os.cpu_count() or 1)
+    batch, batch_paths, id, count = [], [], first_id, 0
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        for path, articles in ReadArchives(executor, paths, publication_type, max_pending):
+            batch.extend(articles)
+            batch_paths.append((path, len(articles)))
+            if len(batch) >= batchsize:
+                written, id = WriteBatch(batch, id, path_articles, path_paragraphs, fingerprints)
+                RecordBatch(manifest, fingerprints, batch_paths, id)
+                count, batch, batch_paths = count + written, [], []
+    if batch_paths:
+        written, id = WriteBatch(batch, id, path_articles, path_paragraphs, fingerprints)
+        RecordBatch(manifest, fingerprints, batch_paths, id)
+        count += written
+    return count
+
+
+def WriteBatch(articles, first_id, path_articles, path_paragraphs, fingerprints=None):
+    """
+    write a batch of parsed articles to both datasets (without duplicates if a FingerprintIndex is given),
+    returns the number of written articles and the next free id
+    """
+    if fingerprints is not None:
+        keep = fingerprints.Deduplicate(['\n'.join(a['Paragraphs']) for a in articles], [a['Date'] for a in articles],
+                                        [a['Headline'] for a in articles])
+        articles = [article for article, k in zip(articles, keep) if k]
+    if articles:
+        df_articles, df_paragraphs = ArticlesToFrames(articles, first_id)
+        WriteShard(df_articles, path_articles)
+        WriteShard(df_paragraphs, path_paragraphs)
+    return len(articles), first_id + len(articles)
+
+
+def RecordBatch(manifest, fingerprints, batch_paths, next_id):
+    """
+    record the archives of a written batch in the manifest and save the fingerprints
+    """
+    if fingerprints is not None:
+        fingerprints.Save()
+    if manifest is None:
+        return
+    for path, articles in batch_paths:
+        manifest.Add(path, articles)
+    manifest.next_id = next_id
+    manifest.Save()
+
+
+if __name__ == '__main__':
+    from python.ConfigUser import path_downloads, path_processedarticles
+
+    files = sorted(glob.glob(os.path.join(path_downloads, '*.ZIP')) + glob.glob(os.path.join(path_downloads, '*.zip')))
+    n = IngestNexis(files, path_articles=path_processedarticles + 'feather/auto_articles_withbattery',
+                    path_paragraphs=path_processedarticles + 'feather/auto_paragraphs_withbattery',
+                    manifest=IngestManifest(path_processedarticles + 'feather/ingest_manifest.json'),
+                    fingerprints=FingerprintIndex(path_processedarticles + 'feather/fingerprints'))
+    print('ingested {} articles from {} files'.format(n, len(files)))
@@ -0,0 +1,195 @@
+"""
+Inverted index over the article texts (Article_backup) and lemma streams (e.g. Nouns_lemma) for term, phrase and
+date range queries with keyword-in-context snippets: each added batch becomes an immutable segment of flat numpy
+arrays (sorted terms, postings of article, position), saved as .npy files and loaded memory-mapped, so new batches
+are indexed without rebuilding the existing segments
+"""
+import os, re
+import numpy
+import pandas
+
+token_pattern = re.compile(r"\w+(?:[-']\w+)*")
+
+
+def Tokenize(text):
+    """
+    lower cased tokens of a text with their character spans: [(token, start, end), ...]
+    """
+    return [(m.group().lower(), m.start(), m.end()) for m in token_pattern.finditer(text)]
+
+
+def FlatPostings(streams):
+    """
+    sorted terms, term offsets and (document, position) postings sorted by term, document, position; and the
+    stream of term ids per document
+    """
+    lengths = numpy.fromiter((len(s) for s in streams), dtype=numpy.int64, count=len(streams))
+    # ids in order of first occurrence (hash table over the token objects), then renumbered in sorted term order;
+    # only the distinct terms become a fixed-width string array
+    first_ids, uniques = pandas.factorize(pandas.Series([t for s in streams for t in s], dtype=object))
+    uniques = numpy.asarray(uniques, dtype=object)
+    sorter = numpy.argsort(uniques, kind='stable')
+    terms = uniques[sorter].astype(str)
+    rank = numpy.empty(len(sorter), dtype=numpy.int64)
+    rank[sorter] = numpy.arange(len(sorter))
+    term_ids = rank[first_ids]
+    doc = numpy.repeat(numpy.arange(len(streams), dtype=numpy.int32), lengths)
+    pos = (numpy.arange(lengths.sum()) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)).astype(numpy.int32)
+    order = numpy.lexsort((pos, doc, term_ids))
+    term_offsets = numpy.searchsorted(term_ids[order], numpy.arange(len(terms) + 1)).astype(numpy.int64)
+    return {'terms': terms, 'term_offsets': term_offsets, 'doc': doc[order], 'pos': pos[order],
+            'stream': term_ids.astype(numpy.int32), 'stream_offsets': numpy.append(0, numpy.cumsum(lengths))}
+
+
+class IndexSegment:
+    """
+    one indexed batch of articles: ids, dates, texts (utf-8 bytes with offsets) and per field the postings
+    """
+
+    def __init__(self, arrays, fields):
+        self.arrays, self.fields = arrays, fields
+
+    @classmethod
+    def Build(cls, article_ids, dates, texts, lemma_lists=None):
+        texts = [str(t) for t in texts]
+        encoded = [t.encode('utf-8') for t in texts]
+        arrays = {'article_ids': numpy.asarray(article_ids, dtype=numpy.int64),
+                  'dates': pandas.to_datetime(pandas.Series(list(dates))).to_numpy(dtype='datetime64[D]'),
+                  'text_bytes': numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8),
+                  'text_offsets': numpy.append(0, numpy.cumsum([len(e) for e in encoded], dtype=numpy.int64))}
+        streams = {'text': [[t for t, _, _ in Tokenize(text)] for text in texts]}
+        if lemma_lists is not None:
+            streams['lemma'] = [[str(t).lower() for t in lemmas] for lemmas in lemma_lists]
+        for field, field_streams in streams.items():
+            for name, array in FlatPostings(field_streams).items():
+                if field == 'text' and name.startswith('stream'):
+                    continue  # text context is taken from the text itself
+                arrays[field + '_' + name] = array
+        return cls(arrays, list(streams))
+
+    def Save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, array in self.arrays.items():
+            numpy.save(os.path.join(path, name + '.npy'), array)
+
+    @classmethod
+    def Load(cls, path, mmap='r'):
+        arrays = {name[:-4]: numpy.load(os.path.join(path, name), mmap_mode=mmap)
+                  for name in os.listdir(path) if name.endswith('.npy')}
+        fields = [field for field in ('text', 'lemma') if field + '_terms' in arrays]
+        return cls(arrays, fields)
+
+    def Text(self, doc):
+        offsets = self.arrays['text_offsets']
+        return bytes(self.arrays['text_bytes'][offsets[doc]:offsets[doc + 1]]).decode('utf-8')
+
+    def Postings(self, term, field='text'):
+        """
+        (document, position) arrays of a term
+        """
+        if field not in self.fields:
+            return numpy.zeros(0, dtype=numpy.int32), numpy.zeros(0, dtype=numpy.int32)
+        terms = self.arrays[field + '_terms']
+        i = numpy.searchsorted(terms, term)
+        if i == len(terms) or terms[i] != term:
+            return numpy.zeros(0, dtype=numpy.int32), numpy.zeros(0, dtype=numpy.int32)
+        start, end = self.arrays[field + '_term_offsets'][i:i + 2]
+        return self.arrays[field + '_doc'][start:end], self.arrays[field + '_pos'][start:end]
+
+    def Phrase(self, tokens, field='text', start=None, end=None):
+        """
+        documents and start positions of consecutive tokens, optionally only articles dated within [start, end]
+        """
+        doc, pos = self.Postings(tokens[0], field)
+        keys = (doc.astype(numpy.int64) << 32) + pos
+        for offset, token in enumerate(tokens[1:], start=1):
+            next_doc, next_pos = self.Postings(token, field)
+            next_keys = (next_doc.astype(numpy.int64) << 32) + next_pos - offset
+            keys = numpy.intersect1d(keys, next_keys, assume_unique=True)
+        doc, pos = (keys >> 32).astype(numpy.int32), (keys & 0xFFFFFFFF).astype(numpy.int32)
+        dates = self.arrays['dates'][doc]
+        keep = numpy.ones(len(doc), dtype=bool)
+        if start is not None:
+            keep &= dates >= numpy.datetime64(pandas.Timestamp(start).date())
+        if end is not None:
+            keep &= dates <= numpy.datetime64(pandas.Timestamp(end).date())
+        return doc[keep], pos[keep]
+
+    def Context(self, doc, pos, length, field='text', width=60, window=8):
+        """
+        left context, match and right context of a hit (width characters of text, window lemmas of a lemma stream)
+        """
+        if field == 'text':
+            text = self.Text(doc)
+            spans = Tokenize(text)
+            match_start, match_end = spans[pos][1], spans[pos + length - 1][2]
+            return (text[max(0, match_start - width):match_start], text[match_start:match_end],
+                    text[match_end:match_end + width])
+        offset = self.arrays[field + '_stream_offsets'][doc]
+        stream = self.arrays[field + '_stream'][offset:self.arrays[field + '_stream_offsets'][doc + 1]]
+        terms = self.arrays[field + '_terms']
+        words = lambda ids: ' '.join(terms[ids].tolist())
+        return (words(stream[max(0, pos - window):pos]), words(stream[pos:pos + length]),
+                words(stream[pos + length:pos + length + window]))
+
+
+class InvertedIndex:
+    """
+    all segments in folder path (segment-%05d); Add() indexes a new batch as new segment, articles which are
+    already indexed are skipped
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.segments = [IndexSegment.Load(os.path.join(path, name)) for name in sorted(os.listdir(path))
+                         if name.startswith('segment-')]
+        self.article_ids = set()
+        for segment in self.segments:
+            self.article_ids.update(segment.arrays['article_ids'].tolist())
+
+    def Add(self, article_ids, dates, texts, lemma_lists=None):
+        """
+        index a batch of articles (ids, dates, texts and optionally lemma lists), returns number of new articles
+        """
+        article_ids = list(article_ids)
+        new = [i for i, a in enumerate(article_ids) if a not in self.article_ids]
+        if not new:
+            return 0
+        dates, texts = list(dates), list(texts)
+        lemma_lists = None if lemma_lists is None else list(lemma_lists)
+        segment = IndexSegment.Build([article_ids[i] for i in new], [dates[i] for i in new], [texts[i] for i in new],
+                                     None if lemma_lists is None else [lemma_lists[i] for i in new])
+        segment.Save(os.path.join(self.path, 'segment-%05d' % len(self.segments)))
+        self.segments.append(segment)
+        self.article_ids.update(article_ids[i] for i in new)
+        return len(new)
+
+    def Search(self, query, field='text', start=None, end=None, width=60, window=8, kwic=True):
+        """
+        hits of a term or phrase (several words) in field 'text' or 'lemma', optionally only in articles dated
+        within [start, end]; returns dataframe with Article_ID, Date, Position and the KWIC columns Left, Match, Right
+        """
+        tokens = [t for t, _, _ in Tokenize(query)] if field == 'text' else query.lower().split()
+        columns = ['Article_ID', 'Date', 'Position'] + (['Left', 'Match', 'Right'] if kwic else [])
+        if not tokens:
+            return pandas.DataFrame(columns=columns)
+        rows = []
+        for segment in self.segments:
+            doc, pos = segment.Phrase(tokens, field, start, end)
+            for d, p in zip(doc.tolist(), pos.tolist()):
+                row = [int(segment.arrays['article_ids'][d]), segment.arrays['dates'][d], p]
+                if kwic:
+                    row.extend(segment.Context(d, p, len(tokens), field, width, window))
+                rows.append(row)
+        result = pandas.DataFrame(rows, columns=columns)
+        result['Date'] = pandas.to_datetime(result['Date'])
+        return result.sort_values(['Date', 'Article_ID', 'Position']).reset_index(drop=True)
+
+    def Timeline(self, query, field='text', freq='Y', start=None, end=None):
+        """
+        number of hits and of articles with hits per period (e.g. usage of 'ladesäule' per year)
+        """
+        hits = self.Search(query, field, start, end, kwic=False)
+        period = hits['Date'].dt.to_period(freq).rename('Period')
+        return hits.groupby(period).agg(Hits=('Position', 'size'), Articles=('Article_ID', 'nunique'))
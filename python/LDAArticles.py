@@ -1,28 +1,41 @@
 import pandas
 import pprint as pp
-from gensim.corpora import Dictionary
 from gensim.models import LdaModel
 from python.ConfigUser import path_processedarticles
-import python.main
+from python.main import calibration_fraction, exhaustive_topic_sweep
 from python.ProcessingFunctions import MakeListInLists
+from python.Vocabulary import Vocabulary, InternedCorpus
+from python.StreamingVocabulary import StreamingFilterExtremes
+from python.ModelPersistence import SaveLdaModel, DocTopicMatrix
+from python.LdaEvaluation import TrainLdaHeldOut
+from python.Subsampling import StratifiedSample
+from python.SimilarityIndex import SimilarityIndex
 
 # Read in file with articles from R-script ProcessNexisArticles.R
 df_articles_lda = pandas.read_csv(path_processedarticles + 'articles_for_lda_analysis.csv', sep='\t')
 
+# Calibration runs: use a reproducible sample, stratified by year and newspaper (see Subsampling.py)
+if calibration_fraction is not None:
+    df_articles_lda = StratifiedSample(df_articles_lda, fraction=calibration_fraction, freq='Y')
+
 # Remove rare and common tokens
 nouns = MakeListInLists(df_articles_lda['Nouns_lemma'])
 
-# Create a dictionary representation of the documents
-dict_nouns = Dictionary(nouns)
+# Filter out words that occur less than 20 documents, or more than 20% of the documents
+# (on a calibration sample no_below is scaled down with the sample fraction); the filtered dictionary is built in
+# bounded memory (count-min sketch, see StreamingVocabulary.py), same result as Dictionary() + filter_extremes()
+no_below = 20 if calibration_fraction is None else max(2, int(round(20 * calibration_fraction)))
+dict_nouns = StreamingFilterExtremes(nouns, no_below=no_below, no_above=0.2)
 
 # Display
 # pp.pprint(dict_nouns.token2id)
 
-# Filter out words that occur less than 20 documents, or more than 50% of the documents
-dict_nouns.filter_extremes(no_below=20, no_above=0.2)
-
-# Bag-of-words representation of the documents
-corpus_nouns = [dict_nouns.doc2bow(doc) for doc in nouns]
+# Intern only the kept lemmas to int32 ids, bag-of-words representation of the documents
+nouns_interned = InternedCorpus.FromLists(nouns, Vocabulary.FromDictionary(dict_nouns))
+corpus_nouns = nouns_interned.Bow(dict_nouns)
+# for parallel stages (process pools) copy it once to shared memory, workers attach without copying:
+# from python.SharedCorpus import SharedCorpus
+# corpus_nouns = SharedCorpus.Create(corpus_nouns)
 
 # Make a index to word dictionary
 temp = dict_nouns[0]  # This is only to "load" the dictionary
@@ -36,10 +49,17 @@ pp.pprint(id2word_nouns)
 # print('Number of unique tokens: {}'.format(len(dict_nouns)))
 # print('Number of documents: {}'.format(len(corpus_nouns)))
 
-# TODO: save corpus and dictionary to disk and load them back
-# save to path_lda_data
+# Train in one pass as before (in random order), evaluated on a fixed 5% held-out sample 4 times per pass; with
+# passes > 1 training stops at the end of a pass once the held-out bound no longer improves
+lda_nouns, lda_nouns_eval = TrainLdaHeldOut(corpus_nouns, id2word_nouns, num_topics=5, holdout=0.05,
+                                            evaluations_per_pass=4, patience=2, iterations=300)
+
+# Save model, dictionary and doc-topic matrix (load them back memory-mapped with LoadLdaModel)
+doc_topics_nouns = DocTopicMatrix(lda_nouns, corpus_nouns)
+SaveLdaModel(path_processedarticles + 'lda/articles', lda_nouns, dict_nouns, doc_topics_nouns)
 
-lda_nouns = LdaModel(corpus=corpus_nouns, id2word=id2word_nouns, num_topics=5, iterations=300, eval_every=1)
+# Similarity index in topic space ("articles like this one"), load with SimilarityIndex.Load() and query with Similar()
+SimilarityIndex.FromDocTopics(doc_topics_nouns, df_articles_lda['ID']).Save(path_processedarticles + 'lda/similarity')
 
 lda_nouns.print_topics(-1)
 
@@ -89,12 +109,18 @@ def compute_coherence_values(dictionary, corpus, texts, id2word, topics_limit, t
 
 start, limit, step = 1, 10, 1
 
-model_list, coherence_values = compute_coherence_values(dictionary=dict_nouns, id2word=id2word_nouns, corpus=corpus_nouns, texts=nouns, topics_start=start, topics_limit=limit, topics_step=step)
-# Show graph
-import matplotlib.pyplot as plt
-x = range(start, limit, step)
-plt.plot(x, coherence_values)
-plt.xlabel("Num Topics")
-plt.ylabel("Coherence score")
-plt.legend(("coherence_values"), loc='best')
-plt.show()
+if exhaustive_topic_sweep:
+    model_list, coherence_values = compute_coherence_values(dictionary=dict_nouns, id2word=id2word_nouns, corpus=corpus_nouns, texts=nouns, topics_start=start, topics_limit=limit, topics_step=step)
+    # Show graph
+    import matplotlib.pyplot as plt
+    x = range(start, limit, step)
+    plt.plot(x, coherence_values)
+    plt.xlabel("Num Topics")
+    plt.ylabel("Coherence score")
+    plt.legend(("coherence_values"), loc='best')
+    plt.show()
+else:
+    # successive halving on a 20% subsample, scored on held-out documents (see ModelSelection.py)
+    from python.ModelSelection import SuccessiveHalving
+    ranking, halving_models = SuccessiveHalving(corpus_nouns, dict_nouns, nouns, candidates=range(start, limit, step))
+    print(ranking)
@@ -1,10 +1,12 @@
 import pandas
 import pprint as pp
-from gensim.corpora import Dictionary
 from gensim.models import LdaModel
 from python.ConfigUser import path_processedarticles
 import python.main
 from python.ProcessingFunctions import MakeListInLists
+from python.Vocabulary import InternedCorpus
+from python.ModelPersistence import SaveLdaModel, DocTopicMatrix
+from python.LdaEvaluation import TrainLdaHeldOut
 
 # Read in file with articles from R-Skript ProcessNexisArticles.R
 df_articles_sentences_lda = pandas.read_csv(path_processedarticles + 'sentences_for_lda_analysis.csv', sep='\t')
@@ -12,8 +14,9 @@ df_articles_sentences_lda = pandas.read_csv(path_processedarticles + 'sentences_
 # Read in list in list (=1 sentences 1 doc)
 sentences = MakeListInLists(df_articles_sentences_lda['Article_sentence_tokenized'])
 
-# Create a dictionary representation of the documents
-dict_nouns = Dictionary(sentences)
+# Intern lemmas to int32 ids and create a dictionary representation of the documents
+sentences_interned = InternedCorpus.FromLists(sentences)
+dict_nouns = sentences_interned.ToDictionary()
 
 # Display
 # pp.pprint(dict_nouns.token2id)
@@ -22,7 +25,7 @@ dict_nouns = Dictionary(sentences)
 dict_nouns.filter_extremes(no_below=20, no_above=0.2)
 
 # Bag-of-words representation of the documents
-corpus_nouns = [dict_nouns.doc2bow(doc) for doc in sentences]
+corpus_nouns = sentences_interned.Bow(dict_nouns)
 
 # Make a index to word dictionary
 temp = dict_nouns[0]  # This is only to "load" the dictionary
@@ -36,10 +39,12 @@ pp.pprint(id2word_nouns)
 # print('Number of unique tokens: {}'.format(len(dict_nouns)))
 # print('Number of documents: {}'.format(len(corpus_nouns)))
 
-# TODO: save corpus and dctionary to disk and load them back
-# save to path_lda_data
+lda_nouns, lda_nouns_eval = TrainLdaHeldOut(corpus_nouns, id2word_nouns, num_topics=5, holdout=0.05,
+                                            evaluations_per_pass=4, patience=2, iterations=300)
 
-lda_nouns = LdaModel(corpus=corpus_nouns, id2word=id2word_nouns, num_topics=5, iterations=300, eval_every=1)
+# Save model, dictionary and doc-topic matrix (load them back memory-mapped with LoadLdaModel)
+doc_topics_sentences = DocTopicMatrix(lda_nouns, corpus_nouns)
+SaveLdaModel(path_processedarticles + 'lda/sentences', lda_nouns, dict_nouns, doc_topics_sentences)
 
 lda_nouns.print_topics(-1)
 
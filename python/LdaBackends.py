@@ -0,0 +1,146 @@
+"""
+Interchangeable LDA engines with a common interface (Fit, Transform, Topics, Save, Load): gensim LdaModel (online
+variational Bayes) and scikit-learn LatentDirichletAllocation (batch variational Bayes on a scipy sparse matrix,
+parallel with n_jobs); BenchmarkBackends compares their throughput and coherence on the same corpus
+"""
+import os, time
+import joblib
+import numpy
+import pandas
+import scipy.sparse
+from gensim.corpora import Dictionary
+from gensim.models import LdaModel
+from gensim.models.coherencemodel import CoherenceModel
+from sklearn.decomposition import LatentDirichletAllocation
+from python.ModelPersistence import SaveLdaModel, LoadLdaModel, DocTopicMatrix
+from python.SharedCorpus import SharedCorpus
+
+
+def BowToSparse(corpus, num_terms):
+    """
+    convert a bag-of-words corpus to a scipy csr matrix (documents x terms), a SharedCorpus is used without copying
+    """
+    if isinstance(corpus, SharedCorpus):
+        return corpus.ToSparse(num_terms)
+    indptr, indices, data = [0], [], []
+    for bow in corpus:
+        indices.extend(id for id, _ in bow)
+        data.extend(count for _, count in bow)
+        indptr.append(len(indices))
+    return scipy.sparse.csr_matrix((numpy.asarray(data, dtype=numpy.float32), numpy.asarray(indices, dtype=numpy.int32),
+                                    numpy.asarray(indptr, dtype=numpy.int64)), shape=(len(indptr) - 1, num_terms))
+
+
+class LdaBackend:
+    """
+    interface of an LDA engine; params are passed on to the underlying model
+    """
+
+    def __init__(self, num_topics, **params):
+        self.num_topics, self.params = num_topics, params
+        self.model, self.dictionary = None, None
+
+    def Fit(self, corpus, dictionary):
+        """
+        train on a bag-of-words corpus, returns self
+        """
+        raise NotImplementedError
+
+    def Transform(self, corpus):
+        """
+        dense (documents x topics) matrix of topic distributions
+        """
+        raise NotImplementedError
+
+    def Topics(self, topn=10):
+        """
+        top words of each topic
+        """
+        raise NotImplementedError
+
+    def Save(self, path):
+        raise NotImplementedError
+
+    @classmethod
+    def Load(cls, path):
+        raise NotImplementedError
+
+
+class GensimLdaBackend(LdaBackend):
+
+    def Fit(self, corpus, dictionary):
+        self.dictionary = dictionary
+        self.model = LdaModel(corpus=corpus, id2word=dictionary, num_topics=self.num_topics, **self.params)
+        return self
+
+    def Transform(self, corpus):
+        return DocTopicMatrix(self.model, corpus)
+
+    def Topics(self, topn=10):
+        return [[word for word, _ in self.model.show_topic(topic, topn=topn)] for topic in range(self.num_topics)]
+
+    def Save(self, path):
+        SaveLdaModel(path, self.model, self.dictionary)
+
+    @classmethod
+    def Load(cls, path):
+        model, dictionary, _ = LoadLdaModel(path)
+        backend = cls(model.num_topics)
+        backend.model, backend.dictionary = model, dictionary
+        return backend
+
+
+class SklearnLdaBackend(LdaBackend):
+    """
+    batch variational Bayes of scikit-learn, default params: learning_method='batch', n_jobs=-1 (all cores)
+    """
+
+    def __init__(self, num_topics, **params):
+        params = dict({'learning_method': 'batch', 'n_jobs': -1}, **params)
+        super().__init__(num_topics, **params)
+
+    def Fit(self, corpus, dictionary):
+        self.dictionary = dictionary
+        self.model = LatentDirichletAllocation(n_components=self.num_topics, **self.params)
+        self.model.fit(BowToSparse(corpus, len(dictionary)))
+        return self
+
+    def Transform(self, corpus):
+        return self.model.transform(BowToSparse(corpus, len(self.dictionary))).astype(numpy.float32)
+
+    def Topics(self, topn=10):
+        top_ids = numpy.argsort(-self.model.components_, axis=1)[:, :topn]
+        return [[self.dictionary[id] for id in ids] for ids in top_ids.tolist()]
+
+    def Save(self, path):
+        os.makedirs(path, exist_ok=True)
+        joblib.dump(self.model, os.path.join(path, 'lda.joblib'))
+        self.dictionary.save(os.path.join(path, 'dictionary'))
+
+    @classmethod
+    def Load(cls, path):
+        model = joblib.load(os.path.join(path, 'lda.joblib'), mmap_mode='r')
+        backend = cls(model.n_components)
+        backend.model, backend.dictionary = model, Dictionary.load(os.path.join(path, 'dictionary'))
+        return backend
+
+
+def BenchmarkBackends(backends, corpus, dictionary, texts, topn=10, coherence='c_v'):
+    """
+    fit and transform every backend ({name: backend}) on the same corpus, returns a dataframe with training and
+    inference throughput (documents per second) and topic coherence
+    """
+    corpus = corpus if isinstance(corpus, SharedCorpus) else list(corpus)
+    results = []
+    for name, backend in backends.items():
+        start = time.perf_counter()
+        backend.Fit(corpus, dictionary)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        backend.Transform(corpus)
+        transform_time = time.perf_counter() - start
+        cm = CoherenceModel(topics=backend.Topics(topn), texts=texts, dictionary=dictionary, coherence=coherence)
+        results.append({'backend': name, 'num_topics': backend.num_topics, 'fit_seconds': fit_time,
+                        'fit_docs_per_second': len(corpus) / fit_time,
+                        'transform_docs_per_second': len(corpus) / transform_time, coherence: cm.get_coherence()})
+    return pandas.DataFrame(results)
@@ -0,0 +1,85 @@
+"""
+Evaluate LDA training on a fixed held-out document sample instead of eval_every=1 (a perplexity bound over the
+whole training corpus after every update): the model is trained online chunk by chunk (one update() call per chunk),
+the held-out bound is computed a few times per pass, reported to callbacks, and training stops at the end of a pass
+once it no longer improves.
+Not identical to LdaModel(corpus): update() scales the sufficient statistics and the learning rate per call, i.e. per
+chunk instead of per corpus, so the bound differs slightly
+"""
+import numpy
+from gensim.models import LdaModel
+from python.ModelSelection import SplitCorpus
+
+
+def PrintCallback(step, score, model):
+    print('update:', step, 'held-out per-word bound:', score, 'perplexity:', 2 ** -score)
+
+
+class HeldOutEvaluator:
+    """
+    scores a model on heldout_corpus every `every` chunk updates; converged after `patience` evaluations in a row which
+    improved the per-word bound by less than min_delta; callbacks are called as callback(step, score, model)
+    """
+
+    def __init__(self, heldout_corpus, every=1, patience=2, min_delta=1e-3, callbacks=(PrintCallback,)):
+        self.heldout_corpus = list(heldout_corpus)
+        self.every, self.patience, self.min_delta = every, patience, min_delta
+        self.callbacks = list(callbacks)
+        self.history, self.best, self.stale = [], None, 0
+
+    def Due(self, step):
+        return step % self.every == 0
+
+    def Evaluate(self, model, step):
+        score = model.log_perplexity(self.heldout_corpus)
+        self.history.append((step, score))
+        if self.best is None or score > self.best + self.min_delta:
+            self.best, self.stale = score, 0
+        else:
+            self.stale += 1
+        for callback in self.callbacks:
+            callback(step, score, model)
+        return score
+
+    def Converged(self):
+        return self.stale >= self.patience
+
+
+def TrainLda(corpus, dictionary, num_topics, evaluator, passes=1, chunksize=2000, **params):
+    """
+    train LdaModel online on corpus (list, in training order) in chunks of chunksize documents for `passes` passes
+    (1, as LdaModel's default), evaluating with evaluator when due (counted in chunk updates) and at the end of every
+    pass; stops early only at the end of a pass once the evaluator has converged, so the model always sees the whole
+    corpus; params are passed on to LdaModel (eval_every is disabled)
+    """
+    params = dict(params, eval_every=None)
+    model = LdaModel(id2word=dictionary, num_topics=num_topics, chunksize=chunksize, **params)
+    n_chunks = (len(corpus) + chunksize - 1) // chunksize
+    for step in range(1, passes * n_chunks + 1):
+        start = (step - 1) % n_chunks * chunksize
+        model.update(corpus[start:start + chunksize], passes=1, eval_every=None)
+        end_of_pass = step % n_chunks == 0
+        if evaluator.Due(step) or end_of_pass:
+            evaluator.Evaluate(model, step)
+        if end_of_pass and step < passes * n_chunks and evaluator.Converged():
+            print('converged after', step // n_chunks, 'passes')
+            break
+    return model
+
+
+def TrainLdaHeldOut(corpus, dictionary, num_topics, holdout=0.05, evaluations_per_pass=4, patience=2, min_delta=1e-3,
+                    passes=1, chunksize=2000, random_state=203495, callbacks=(PrintCallback,), **params):
+    """
+    split off a reproducible held-out sample of corpus, train on the rest in a reproducible random order with TrainLda
+    (the corpus is in article order, so every chunk is a sample of the whole period), evaluating about
+    evaluations_per_pass times per pass; returns model and evaluator
+    """
+    corpus = list(corpus)
+    train_ids, heldout_ids = SplitCorpus(len(corpus), 1., holdout, random_state)
+    train_ids = numpy.random.RandomState(random_state).permutation(train_ids)
+    n_chunks = (len(train_ids) + chunksize - 1) // chunksize
+    every = max(1, n_chunks // evaluations_per_pass)
+    evaluator = HeldOutEvaluator([corpus[i] for i in heldout_ids], every, patience, min_delta, callbacks)
+    model = TrainLda([corpus[i] for i in train_ids], dictionary, num_topics, evaluator, passes, chunksize,
+                     random_state=random_state, **params)
+    return model, evaluator
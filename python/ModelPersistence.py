@@ -0,0 +1,50 @@
+"""
+Save and load a trained LDA model with its dictionary and doc-topic matrix; all large numpy arrays are stored as
+separate .npy files and loaded with mmap='r', so loading takes well under a second and several inference
+processes on one host share one physical copy of the arrays
+"""
+import os
+import numpy
+from gensim.corpora import Dictionary
+from gensim.models import LdaModel
+
+
+def DocTopicMatrix(model, corpus, chunksize=2000):
+    """
+    dense (documents x topics) float32 matrix of topic distributions, computed chunk-wise with model.inference()
+    """
+    doc_topics, chunk = [], []
+    for bow in corpus:
+        chunk.append(bow)
+        if len(chunk) == chunksize:
+            doc_topics.append(model.inference(chunk)[0])
+            chunk = []
+    if chunk:
+        doc_topics.append(model.inference(chunk)[0])
+    if not doc_topics:
+        return numpy.zeros((0, model.num_topics), dtype=numpy.float32)
+    gamma = numpy.vstack(doc_topics).astype(numpy.float32)
+    return gamma / gamma.sum(axis=1, keepdims=True)
+
+
+def SaveLdaModel(path, model, dictionary, doc_topics=None):
+    """
+    save model (every numpy array as separate file), dictionary and doc-topic matrix to folder path
+    """
+    os.makedirs(path, exist_ok=True)
+    model.save(os.path.join(path, 'lda.model'), sep_limit=0)
+    dictionary.save(os.path.join(path, 'dictionary'))
+    if doc_topics is not None:
+        numpy.save(os.path.join(path, 'doc_topics.npy'), numpy.asarray(doc_topics, dtype=numpy.float32))
+
+
+def LoadLdaModel(path, mmap='r'):
+    """
+    load model, dictionary and doc-topic matrix (None if not saved) from folder path, arrays memory-mapped
+    """
+    model = LdaModel.load(os.path.join(path, 'lda.model'), mmap=mmap)
+    dictionary = Dictionary.load(os.path.join(path, 'dictionary'))
+    doc_topics = None
+    if os.path.isfile(os.path.join(path, 'doc_topics.npy')):
+        doc_topics = numpy.load(os.path.join(path, 'doc_topics.npy'), mmap_mode=mmap)
+    return model, dictionary, doc_topics
@@ -0,0 +1,71 @@
+"""
+Choose num_topics by successive halving instead of training every candidate to completion
+(compute_coherence_values in LDAArticles.py): all candidates are trained for a small budget on a document subsample
+and scored on held-out documents, only the best fraction gets more passes in the next round
+"""
+import math
+import numpy
+import pandas
+from gensim.models import LdaModel
+from gensim.models.coherencemodel import CoherenceModel
+
+
+def SplitCorpus(n_docs, subsample=0.2, holdout=0.1, random_state=203495):
+    """
+    reproducible random split of document indices into a held-out sample and a training subsample
+    """
+    order = numpy.random.RandomState(random_state).permutation(n_docs)
+    n_holdout = max(1, int(holdout * n_docs))
+    n_train = max(1, int(subsample * n_docs))
+    return sorted(order[n_holdout:n_holdout + n_train].tolist()), sorted(order[:n_holdout].tolist())
+
+
+def ScoreModel(model, heldout_corpus, heldout_texts, dictionary, coherence='c_v'):
+    """
+    held-out per-word likelihood bound (higher is better) and topic coherence of a model
+    """
+    perplexity_bound = model.log_perplexity(heldout_corpus)
+    cm = CoherenceModel(model=model, texts=heldout_texts, dictionary=dictionary, coherence=coherence)
+    return perplexity_bound, cm.get_coherence()
+
+
+def SuccessiveHalving(corpus, dictionary, texts, candidates=range(1, 10), subsample=0.2, holdout=0.1, passes=1,
+                      eta=2, min_candidates=1, score='coherence', coherence='c_v', random_state=203495, **params):
+    """
+    corpus: bag-of-words corpus (list), texts: tokenized documents (for coherence), candidates: num_topics values;
+    round r trains the remaining candidates for passes * eta**r passes in total and keeps the best 1/eta of them by
+    score ('coherence' or 'perplexity') until min_candidates are left; params are passed on to LdaModel.
+    Returns the ranked shortlist (dataframe, best first) and the dict of trained models {num_topics: model}
+    """
+    key = 'coherence' if score == 'coherence' else 'perplexity_bound'
+    params = dict({'alpha': 'auto', 'eta': 'auto', 'eval_every': None}, **params)
+    train_ids, heldout_ids = SplitCorpus(len(corpus), subsample, holdout, random_state)
+    train = [corpus[i] for i in train_ids]
+    heldout_corpus, heldout_texts = [corpus[i] for i in heldout_ids], [texts[i] for i in heldout_ids]
+
+    models, results, remaining, rnd, trained_passes = {}, {}, list(candidates), 0, 0
+    while True:
+        budget = passes * eta ** rnd
+        for num_topics in remaining:
+            if num_topics not in models:
+                models[num_topics] = LdaModel(corpus=train, id2word=dictionary, num_topics=num_topics,
+                                              passes=budget, random_state=random_state, **params)
+            else:
+                models[num_topics].update(train, passes=budget - trained_passes)
+            perplexity_bound, coherence_value = ScoreModel(models[num_topics], heldout_corpus, heldout_texts,
+                                                           dictionary, coherence)
+            results[num_topics] = {'num_topics': num_topics, 'round': rnd, 'passes': budget,
+                                   'perplexity_bound': perplexity_bound, 'coherence': coherence_value}
+            print('round:', rnd, 'num_topics:', num_topics, 'coherence:', coherence_value,
+                  'perplexity bound:', perplexity_bound)
+        trained_passes = budget
+        remaining = sorted(remaining, key=lambda n: results[n][key], reverse=True)
+        remaining = remaining[:max(min_candidates, int(math.ceil(len(remaining) / eta)))]
+        # the shortlist is complete, do not train it for another round
+        if len(remaining) <= min_candidates:
+            break
+        rnd += 1
+
+    ranking = pandas.DataFrame(list(results.values()))
+    ranking = ranking.sort_values(['round', key], ascending=False).reset_index(drop=True)
+    return ranking, models
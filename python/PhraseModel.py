@@ -0,0 +1,62 @@
+"""
+Learn multi-word units (collocations like 'ig metall', 'formel eins') from the lemma streams instead of adding more
+hand-written rules to NormalizeWords(): gensim Phrases counts bigrams in one streaming pass with bounded memory
+(max_vocab_size), the frozen model is small, picklable and fast to apply in every preprocessing process.
+Phrases are learned from and joined in the full lemma stream of each sentence (all tokens, before the POS views are
+selected), so the counts reflect adjacent words in the text and not adjacent nouns
+"""
+import os, ast
+from gensim.models.phrases import Phrases, Phraser
+
+
+def LearnPhrases(streams, min_count=20, threshold=10., max_vocab_size=20000000):
+    """
+    learn collocations from an iterable of token lists (e.g. sentence lemma lists, can be a generator) and return
+    the frozen phrase model; max_vocab_size bounds the memory of the bigram counts (rare bigrams are pruned)
+    """
+    phrases = Phrases(min_count=min_count, threshold=threshold, max_vocab_size=max_vocab_size)
+    phrases.add_vocab(streams)
+    return Phraser(phrases)
+
+
+def SavePhrases(phraser, path):
+    phraser.save(path)
+
+
+def LoadPhrases(path):
+    return Phraser.load(path)
+
+
+def JoinPhrases(phraser, tokens):
+    """
+    join the tokens (TokenProjection's of all words of a sentence, see ProcessingFunctions.ProjectTokens()) of learned
+    collocations into one token, e.g. lemmas ['ig', 'metall'] -> ['ig-metall'] (hyphen, which SentenceCleaner()
+    keeps); the joined token is tagged like its last noun (else its last word), so a POS view keeps or drops it whole
+    """
+    delimiter = phraser.delimiter.decode() if isinstance(phraser.delimiter, bytes) else phraser.delimiter
+    joined, i = [], 0
+    for unit in phraser[[token.lemma for token in tokens]]:
+        j = i + 1
+        while j < len(tokens) and delimiter.join(token.lemma for token in tokens[i:j]) != unit:
+            j += 1
+        parts = tokens[i:j]
+        if len(parts) == 1:
+            joined.append(parts[0])
+        else:
+            tag = next((token.tag_ for token in reversed(parts) if token.tag_.startswith('NN')), parts[-1].tag_)
+            joined.append(parts[-1]._replace(text=' '.join(token.text for token in parts), tag_=tag,
+                                             lemma='-'.join(token.lemma for token in parts)))
+        i = j
+    return joined
+
+
+if __name__ == '__main__':
+    import pandas
+    from python.ConfigUser import path_processedarticles
+
+    # learn from the full sentence lemma streams (all tokens) exported by PreprocessingTrunk.py
+    df_sentences = pandas.read_csv(path_processedarticles + 'csv/sentence_lemmas_for_phrases.csv', sep='\t')
+    streams = (sent for article in df_sentences['Article_sentence_lemmas'] for sent in ast.literal_eval(article))
+    phraser = LearnPhrases(streams)
+    SavePhrases(phraser, os.path.join(path_processedarticles, 'phrases.model'))
+    print('learned {} phrases'.format(len(phraser.phrasegrams)))
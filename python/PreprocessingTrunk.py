@@ -0,0 +1,160 @@
+"""
+Shared preprocessing trunk: read, clean, normalize and POS tag the articles once and fan out to the article,
+sentence and paragraph level outputs (csv files for the LDA scripts and the Excel reports); PreprocessingArticles.py,
+PreprocessingSentences.py and PreprocessingParagraphs.py only run this trunk, so all LDA inputs come from the same
+processing
+"""
+import os, re
+from python.ConfigUser import path_processedarticles
+from python.IngestNexis import ReadDataset
+from python.ProcessingFunctions import NormalizeWords, DateRemover, NumberComplexRemover, SentenceWordRemover, \
+    SentenceLinkRemover, SentenceMailRemover, ParagraphSentencePOStagger, SentenceLemmatizer, \
+    SentenceTokenCleaner, FlattenList, nlp2, pos_views, SelectView
+from python.TextUnits import TextUnits
+from python.PhraseModel import LoadPhrases
+from python.DocBinCache import DocBinCache
+from python.Boilerplate import RemoveBoilerplate
+from python.InvertedIndex import InvertedIndex
+from python.ReportExport import ExportReport
+from python.main import export_excel, excel_max_rows
+
+# Read in paragraphs from IngestNexis.py (or feather file from R-Skript ProcessNexisArticles.R)
+df_paragraphs = ReadDataset(path_processedarticles + 'feather/auto_paragraphs_withbattery')
+
+# Flat (article_id, seq, text) representation of all paragraphs, one row with the meta data per article
+paragraphs = TextUnits.FromFrame(df_paragraphs, id_col='Art_ID', seq_col='Par_ID', text_col='Paragraph')
+df_articles = df_paragraphs[df_paragraphs['Par_ID'] == 1].drop(columns=['Par_ID', 'Paragraph'])
+df_articles['ID'] = df_articles['Art_ID']
+del df_paragraphs
+
+# Make Backup of the original paragraphs (for the paragraph report)
+if export_excel:
+    df_articles['Article_paragraph_backup'] = paragraphs.ToLists(df_articles['Art_ID'])
+
+# convert all words to lower case
+paragraphs = paragraphs.Map(str.lower)
+
+# Drop duplicates
+df_articles['Article'] = [' '.join(x) for x in paragraphs.ToLists(df_articles['Art_ID'])]
+df_articles.drop_duplicates(subset=['Article', 'Date'], inplace=True)
+df_articles.drop_duplicates(subset=['Headline'], inplace=True)
+paragraphs = paragraphs.SelectArticles(df_articles['Art_ID'])
+
+# Remove text which defines end of articles
+splittingstrings = ['graphic', 'foto: classification language', 'classification language', 'kommentar seite ']
+paragraphs = paragraphs.CutFrom([any(s in par for s in splittingstrings) for par in paragraphs.text])
+paragraphs = paragraphs.Map(lambda x: re.sub(r'deliverynotification', ' ', x))
+
+# Make Backup
+df_articles['Article_backup'] = [' '.join(x) for x in paragraphs.ToLists(df_articles['Art_ID'])]
+
+# Create id increasing (needed to merge help files later)
+df_articles.insert(0, 'ID_incr', range(1, 1 + len(df_articles)))
+
+# Remove boilerplate paragraphs (footers, image credits, teasers) which occur in 20 or more articles
+paragraphs, boilerplate_report = RemoveBoilerplate(paragraphs, min_articles=20)
+boilerplate_report.to_csv(path_processedarticles + 'csv/boilerplate_removed.csv', sep='\t', index=False)
+
+# Normalize Words (preserve words by replacing by synonyms and write full words instead abbrev.)
+paragraphs = paragraphs.Map(NormalizeWords)
+
+### Numbers in Text
+# First, remove dates of the format: 20. Februar, e.g.
+paragraphs = paragraphs.Map(DateRemover)
+# Second, remove all complex combinations of numbers and special characters
+paragraphs = paragraphs.Map(NumberComplexRemover)
+# Third, remove all remaining numbers (also from the paragraph output, whose former str.replace('\d+', '') removed
+# nothing)
+paragraphs = paragraphs.Map(lambda x: re.sub(r'\d+', '', x))
+
+### Special Characters
+paragraphs = paragraphs.Map(lambda x: x.replace("'", ''))
+
+### Remove additional words, remove links and emails
+drop_words = ['taz', 'dpa', 'de', 'foto', 'webseite', 'herr', 'interview', 'siehe grafik', 'vdi nachrichten', 'vdi',
+              'reuters', ' mid ', 'sz-online']
+paragraphs = paragraphs.Apply(SentenceWordRemover, dropWords=drop_words)
+paragraphs = paragraphs.Apply(SentenceLinkRemover)
+paragraphs = paragraphs.Apply(SentenceMailRemover)
+df_articles['Article'] = [' '.join(x) for x in paragraphs.ToLists(df_articles['Art_ID'])]
+
+### POS tagging, sentence splitting and lemmatization in a single pass over all paragraphs (time-consuming!)
+# for each paragraph: list of sentences, each a dict of lemma lists per POS view (nouns, nouns+verbs, adjectives)
+# and of all lemmas (view 'Lemmas', the stream the phrase model is learned from)
+# tagged docs are cached per article and model version (see DocBinCache.py), only new or changed articles are tagged
+# the paragraphs are tagged with punctuation (which sentencizer and tagger use) and lemmas are cleaned token-wise
+# afterwards, unlike the former sentence script which tagged cleaned sentence strings: sentence boundaries, tags and
+# lemmas differ from its output
+# multi-word units (e.g. 'ig-metall') are joined in the full lemma stream of each sentence before the POS views are
+# selected, with the frozen phrase model if one was learned (see PhraseModel.py)
+phraser = None
+if os.path.isfile(path_processedarticles + 'phrases.model'):
+    phraser = LoadPhrases(path_processedarticles + 'phrases.model')
+doc_cache = DocBinCache(path_processedarticles + 'docbin', nlp2)
+paragraph_views = paragraphs.Apply(lambda pars: [SentenceLemmatizer(par) for par in
+                                                 ParagraphSentencePOStagger(pars, docs=doc_cache.Pipe(paragraphs),
+                                                                            views=dict(pos_views, Lemmas=None),
+                                                                            phraser=phraser)])
+paragraph_sentences = paragraph_views.Map(lambda x: SentenceTokenCleaner(SelectView(x, 'Nouns')))
+print('tagged docs from cache: {} articles, newly tagged: {} articles'.format(doc_cache.hits, doc_cache.misses))
+
+sentences = TextUnits.FromLists(df_articles['Art_ID'], [FlattenList(x) for x in
+                                                        paragraph_sentences.ToLists(df_articles['Art_ID'])])
+
+### Fan out to the three granularities
+# Articles: all nouns of an article (words of length 1 removed)
+df_articles['Nouns_lemma'] = [[word for word in FlattenList(x) if len(word) > 1] for x in
+                              sentences.ToLists(df_articles['Art_ID'])]
+# the other POS views of the same tagging pass side by side (e.g. Nounverbs_lemma, Adjectives_lemma)
+other_views = [view for view in pos_views if view != 'Nouns']
+for view in other_views:
+    view_sentences = paragraph_views.Map(lambda x: FlattenList(SentenceTokenCleaner(SelectView(x, view))))
+    df_articles[view + '_lemma'] = [[word for word in FlattenList(x) if len(word) > 1] for x in
+                                    view_sentences.ToLists(df_articles['Art_ID'])]
+
+# Sentences: drop words of length 1, drop sentences with less than two words
+sentences = sentences.Map(lambda x: [word for word in x if len(word) >= 2])
+sentences = sentences.Filter([len(x) >= 2 for x in sentences.text])
+df_articles['Article_sentence_nouns_cleaned'] = sentences.ToLists(df_articles['Art_ID'])
+
+# Full lemma stream of each sentence (all tokens), to learn the phrase model from (python -m python.PhraseModel)
+sentence_lemmas = paragraph_views.Map(lambda x: SelectView(x, 'Lemmas'))
+df_articles['Article_sentence_lemmas'] = [FlattenList(x) for x in sentence_lemmas.ToLists(df_articles['Art_ID'])]
+
+# Paragraphs: same cleaning as for sentences
+paragraph_nouns = paragraph_sentences.Map(lambda x: [word for word in FlattenList(x) if len(word) >= 2])
+paragraph_nouns = paragraph_nouns.Filter([len(x) >= 2 for x in paragraph_nouns.text])
+df_articles['Article_paragraph_nouns_cleaned'] = paragraph_nouns.ToLists(df_articles['Art_ID'])
+
+# Add new articles to the inverted index for term/phrase lookups with KWIC snippets (see InvertedIndex.py)
+InvertedIndex(path_processedarticles + 'index').Add(df_articles['ID'], df_articles['Date'], df_articles['Article_backup'],
+                                                    df_articles['Nouns_lemma'])
+
+# Export reports to excel (see ReportExport.py, switch off or cap the number of rows in main.py)
+if export_excel:
+    ExportReport(df_articles, path_processedarticles + 'articles_for_lda_analysis.xlsx',
+                 columns=['ID_incr', 'ID', 'Date', 'Newspaper', 'Article_backup', 'Nouns_lemma'] +
+                 [v + '_lemma' for v in other_views], max_rows=excel_max_rows)
+    ExportReport(df_articles, path_processedarticles + 'Article_sentence_nouns_cleaned.xlsx',
+                 columns=['Article_backup', 'Article_sentence_nouns_cleaned'], max_rows=excel_max_rows)
+    ExportReport(df_articles, path_processedarticles + 'Article_paragraphs_nouns_cleaned.xlsx',
+                 columns=['Article_paragraph_backup', 'Article_paragraph_nouns_cleaned'], max_rows=excel_max_rows)
+
+# Export data to csv (will be read in again in LDAArticles.py, LDASentences.py)
+df_articles[['ID_incr', 'ID', 'Date', 'Newspaper', 'Nouns_lemma'] + [v + '_lemma' for v in other_views]].to_csv(
+    path_processedarticles + 'articles_for_lda_analysis.csv', sep='\t', index=False)
+df_articles[['ID_incr', 'ID', 'Date', 'Article']].to_csv(
+    path_processedarticles + 'textbody_for_lda_analysis.csv', sep='\t', index=False)
+df_articles[['ID_incr', 'ID', 'Date', 'Article_sentence_nouns_cleaned']].to_csv(
+    path_processedarticles + 'csv/sentences_for_lda_analysis.csv', sep='\t', index=False)
+df_articles[['ID_incr', 'Art_ID', 'Date', 'Article_paragraph_nouns_cleaned']].to_csv(
+    path_processedarticles + 'csv/paragraphs_for_lda_analysis.csv', sep='\t', index=False)
+df_articles[['ID_incr', 'ID', 'Date', 'Article_sentence_lemmas']].to_csv(
+    path_processedarticles + 'csv/sentence_lemmas_for_phrases.csv', sep='\t', index=False)
+
+# Noun lemmas per article (e.g. for DescriptivesProcessing.py)
+noun_lemma_list = df_articles['Nouns_lemma'].tolist()
+
+# Clean up to keep RAM small
+del df_articles, paragraphs, boilerplate_report, paragraph_views, paragraph_sentences, paragraph_nouns, sentences, \
+    sentence_lemmas, drop_words
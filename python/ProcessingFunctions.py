@@ -2,13 +2,15 @@
 Create help functions to call when running scripts
 """
 from python.ConfigUser import path_project
-import xlsxwriter
 from textdistance import jaro
 from spacy.lang.de import German
 from spacy.tokenizer import Tokenizer
 import spacy
-import re
+import re, sys
+from collections import namedtuple
 from germalemma import GermaLemma
+from python.ReportExport import WriteRows
+from python.PhraseModel import JoinPhrases
 
 
 def MakeListInLists(string):
@@ -49,16 +51,7 @@ def ExportFreqDict(wordlist, path=path_project + 'data/', filename='frequency_wo
     exports the produced frequency-wordlist from ListToFreqDict to an excel file
     input: so list with tuples with the form [(,),(,),...]
     """
-    workbook = xlsxwriter.Workbook(path + filename)
-    worksheet = workbook.add_worksheet()
-    row, col = 1, 0
-    worksheet.write(0, 0, 'word')
-    worksheet.write(0, 1, 'frequency')
-    for el in wordlist:
-        worksheet.write(row, col, el[0])
-        worksheet.write(row, col + 1, el[1])
-        row += 1
-    workbook.close()
+    WriteRows(path + filename, ['word', 'frequency'], wordlist)
 
 
 def GetUniqueStrings(list, threshold=.9, verbose=False):
@@ -185,39 +178,126 @@ def SentenceCleaner(listOfSents):
     return [p.sub(lambda m: (m.group(1) if m.group(1) else " "), x) for x in listOfSents]
 
 
+# Load Lemmatization
+lemmatizer = GermaLemma()
+
+# compact projection of a spacy token (no reference to its doc, so docs can be released right after tagging)
+TokenProjection = namedtuple('TokenProjection', ['text', 'tag_', 'lemma'])
+
+
+def ProjectTokens(tokens, POStag=None):
+    """
+    extract text, tag and lowercased lemma of the (POS filtered) tokens of a spacy doc or span;
+    POStag: STTS tag prefix or tuple of prefixes, e.g. ('NN', 'VV')
+    """
+    projection = []
+    for token in tokens:
+        if POStag is None or token.tag_.startswith(POStag):
+            try:
+                lemma = lemmatizer.find_lemma(token.text, token.tag_).lower()
+            except ValueError:  # GermaLemma supports nouns, verbs, adjectives and adverbs only
+                lemma = token.lemma_.lower()
+            projection.append(TokenProjection(token.text, sys.intern(token.tag_), lemma))
+    return projection
+
+
+# named POS views (tuples of STTS tag prefixes), extracted side by side from one tagging pass with views=pos_views
+pos_views = {'Nouns': ('NN',), 'Nounverbs': ('NN', 'VV'), 'Adjectives': ('ADJ',)}
+
+
+def ProjectViews(tokens, views, phraser=None):
+    """
+    project the tokens of a spacy doc or span once and split them into named views: {view: [TokenProjection, ...]};
+    a view with tags None keeps all tokens; with a phraser (see PhraseModel.py) learned collocations are joined in
+    the full token stream before the views are selected
+    """
+    tags = [view_tags for view_tags in views.values() if view_tags is not None]
+    POStag = None if phraser is not None or len(tags) < len(views) else tuple(set(FlattenList(tags)))
+    projection = ProjectTokens(tokens, POStag=POStag)
+    if phraser is not None:
+        projection = JoinPhrases(phraser, projection)
+    return {view: [token for token in projection if tags is None or token.tag_.startswith(tags)]
+            for view, tags in views.items()}
+
+
+def SelectView(listOfSents, view):
+    """
+    select one view from sentences (or paragraphs of sentences) tagged with views
+    """
+    return [SelectView(sent, view) if isinstance(sent, list) else sent[view] for sent in listOfSents]
+
+
 nlp2 = spacy.load('de_core_news_md', disable=['ner', 'parser'])
+nlp2.add_pipe(nlp2.create_pipe('sentencizer'))
+
 
-def SentencePOStagger(listOfSents, POStag='NN'):
+def SentencePOStagger(listOfSents, POStag='NN', views=None):
     """
-    POS tag words in sentences
+    POS tag words in sentences, returns TokenProjection's so the spacy docs are not kept;
+    with views (e.g. pos_views) each sentence is returned as {view: [TokenProjection, ...]} instead
     """
-    POStaggedlist = []
-    for sent in listOfSents:
-        list, sent_tokens = nlp2(sent), []
-        for token in list:
-            if token.tag_.startswith(POStag): sent_tokens.append(token)
-        POStaggedlist.append(sent_tokens)
-    return POStaggedlist
+    if views is not None:
+        return [ProjectViews(doc, views) for doc in nlp2.pipe(listOfSents)]
+    return [ProjectTokens(doc, POStag=POStag) for doc in nlp2.pipe(listOfSents)]
 
 
-# Load Lemmatization
-lemmatizer = GermaLemma()
+def ParagraphSentencePOStagger(listOfPars, POStag='NN', docs=None, views=None, phraser=None):
+    """
+    POS tag each paragraph once and take the sentence boundaries from the same doc (sentencizer in nlp2);
+    returns for each paragraph a list of sentences with POS tagged words (TokenProjection's, or dicts of views
+    like SentencePOStagger() if views are given, with collocations of phraser joined, see ProjectViews());
+    docs: already tagged docs of listOfPars (e.g. from DocBinCache.Pipe()), tagged with nlp2 if None
+    """
+    POStaggedlist = []
+    for doc in (nlp2.pipe(listOfPars) if docs is None else docs):
+        if views is not None:
+            POStaggedlist.append([ProjectViews(sent, views, phraser) for sent in doc.sents])
+        else:
+            POStaggedlist.append([ProjectTokens(sent, POStag=POStag) for sent in doc.sents])
+    return POStaggedlist
 
 
 def SentenceLemmatizer(listOfSents):
     """
     Lemmatizer of POS tagged words in sentences. Run this fct after SentencePOStagger()
+    sentences tagged with views are returned as {view: lemmas}
     """
     lemmalist = []
     for sent in listOfSents:
+        if isinstance(sent, dict):
+            lemmalist.append({view: SentenceLemmatizer([tokens])[0] for view, tokens in sent.items()})
+            continue
         lemmalist.append([])
         for token in sent:
-            token_lemma = lemmatizer.find_lemma(token.text, token.tag_)
-            token_lemma = token_lemma.lower()
+            if isinstance(token, TokenProjection):
+                token_lemma = token.lemma
+            else:
+                token_lemma = lemmatizer.find_lemma(token.text, token.tag_)
+                token_lemma = token_lemma.lower()
             lemmalist[-1].append(token_lemma)
     return lemmalist
 
 
+def SentenceTokenCleaner(listOfSents):
+    """
+    cleans special characters and punctuations from tokenized sentences and drops blank tokens;
+    run this fct after SentenceLemmatizer()
+    """
+    return [RemoveBlankElements(SentenceCleaner(sent)) for sent in listOfSents]
+
+
+def SentenceSplitPOStagger(listOfTexts, POStag='NN', docs=None):
+    """
+    one pass instead of Sentencizer() + SentenceCleaner() + SentencePOStagger() + SentenceLemmatizer(): each text
+    (article or paragraph) is tagged once with nlp2, sentences are taken from the same doc and punctuation / special
+    characters are cleaned token-wise from the lemmas afterwards; returns for each text a list of sentences with lemmas.
+    Not identical to the old chain: sentencizer and tagger now see the uncleaned text with punctuation (the old chain
+    tagged cleaned sentence strings), so sentence boundaries, tags and lemmas can differ
+    """
+    return [SentenceTokenCleaner(SentenceLemmatizer(sents)) for sents in
+            ParagraphSentencePOStagger(listOfTexts, POStag=POStag, docs=docs)]
+
+
 def SentenceTokenizer(listOfSents):
     """
     load SetupTokenizer() first
@@ -254,6 +334,7 @@ def SentenceCleanTokens(listOfSents, minwordinsent, minwordlength):
 def NormalizeWords(string):
     """
     Normalize Words (Preserve words by replacing to synonyms and write full words instead abbrev.)
+    multi-word units (e.g. names, models) are better learned from the data than added here, see PhraseModel.py
     """
 
     # Normalize e-mobility related words
@@ -0,0 +1,86 @@
+"""
+Excel reports written row by row with xlsxwriter in constant_memory mode (only the current row is kept in memory),
+with column selection and row caps; columns holding other objects than strings, numbers, dates or lists of them
+(e.g. spaCy Doc objects) are never serialized
+"""
+import datetime, numbers
+import pandas
+import xlsxwriter
+
+# limits of the xlsx format
+max_excel_rows = 1048576
+max_cell_chars = 32767
+
+
+def IsPlain(value):
+    """
+    True for values which are written to a report: strings, numbers, dates and (nested) lists/tuples of them
+    """
+    if value is None or isinstance(value, (str, numbers.Number, datetime.date, datetime.datetime)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(IsPlain(v) for v in value[:20])
+    return False
+
+
+def ReportColumns(df, columns=None, sample=20):
+    """
+    selected columns (all if None) without the columns whose first non-null values are not plain
+    """
+    selected = []
+    for col in (df.columns if columns is None else columns):
+        values = df[col].dropna().head(sample) if df[col].dtype == object else []
+        if all(IsPlain(v) for v in values):
+            selected.append(col)
+        else:
+            print('ReportExport: skipping column', col, '(not serializable)')
+    return selected
+
+
+def CellValue(value):
+    if isinstance(value, (list, tuple)):
+        value = str(value)
+    if isinstance(value, str):
+        return value[:max_cell_chars]
+    if isinstance(value, pandas.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def WriteRows(filename, header, rows, max_rows=None, sheet_name='Sheet1'):
+    """
+    stream header and rows (iterable of sequences) to an xlsx file in constant_memory mode, at most max_rows rows
+    (and not more than the format allows), missing values as empty cells; returns number of rows written
+    """
+    limit = max_excel_rows - 1 if max_rows is None else min(max_rows, max_excel_rows - 1)
+    workbook = xlsxwriter.Workbook(filename, {'constant_memory': True, 'strings_to_urls': False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    worksheet.write_row(0, 0, header)
+    n = 0
+    for n, row in enumerate(rows, start=1):
+        if n > limit:
+            n -= 1
+            break
+        for col, value in enumerate(row):
+            value = CellValue(value)
+            if value is None or (isinstance(value, float) and value != value) or value is pandas.NaT:
+                continue
+            if isinstance(value, (datetime.date, datetime.datetime)):
+                worksheet.write_datetime(n, col, value, date_format)
+            else:
+                worksheet.write(n, col, value)
+    workbook.close()
+    return n
+
+
+def ExportReport(df, filename, columns=None, max_rows=None, index=True, sheet_name='Sheet1'):
+    """
+    write the selected columns (all plain columns if None) of the first max_rows rows of df to an xlsx report,
+    replaces df.to_excel() for large dataframes; returns number of rows written
+    """
+    columns = ReportColumns(df, columns)
+    df = df[columns] if max_rows is None else df[columns].head(max_rows)
+    header = ([df.index.name or ''] if index else []) + [str(col) for col in columns]
+    rows = df.itertuples(index=index, name=None)
+    return WriteRows(filename, header, rows, max_rows, sheet_name)
@@ -0,0 +1,99 @@
+"""
+Checkpoint of a GetNexis.py run: records the downloaded result ranges (k-th file of 100 articles) of a search with
+their verified archives, so that a restarted run skips straight to the first missing range
+"""
+import os, json, hashlib
+from selenium.common.exceptions import StaleElementReferenceException
+
+# button with triangle: > (next-page button) on the search results page
+next_page_xpath = '//a[@class="icon la-TriangleRight action"]'
+# form with the result list (checkboxes, download button) of the search results page
+results_xpath = '/html/body/main/div/main/div[2]/div/div[2]/div[2]/form'
+
+
+class ScrapeCheckpoint:
+    """
+    json file with the search url and for each completed range k: first/last result, archive path, size, sha256;
+    a range only counts as completed while its archive still exists with the recorded size
+    """
+
+    def __init__(self, path, search):
+        self.path, self.search, self.ranges = path, search, {}
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            # a checkpoint of another search is not continued
+            if checkpoint['search'] == search:
+                self.ranges = checkpoint['ranges']
+
+    def Save(self):
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'search': self.search, 'ranges': self.ranges}, f, indent=1)
+        os.replace(temp, self.path)
+
+    def IsCompleted(self, k):
+        entry = self.ranges.get(str(k))
+        return entry is not None and os.path.isfile(entry['file']) and os.path.getsize(entry['file']) == entry['size']
+
+    def MarkCompleted(self, k, p1, p2, file):
+        """
+        record a downloaded (and verified, see DownloadWatcher) archive and save the checkpoint
+        """
+        with open(file, 'rb') as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        self.ranges[str(k)] = {'p1': p1, 'p2': p2, 'file': file, 'size': os.path.getsize(file), 'sha256': sha256}
+        self.Save()
+
+    def FirstMissing(self, k=1):
+        """
+        first range k (starting at k) which is not completed
+        """
+        while self.IsCompleted(k):
+            k += 1
+        return k
+
+
+def IsStale(element):
+    """
+    True once element is no longer attached to the page (e.g. the result page was replaced)
+    """
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+def NextPage(driver, policy, max_delay=None):
+    """
+    click 'Next Page' and wait until the clicked button is stale, i.e. the next result page replaced the current one;
+    a button which is not clickable yet is retried (policy: WaitPolicy). Returns False without clicking if there is no
+    'Next Page' button on the current page (last page), which is only decided once the result list is rendered
+    """
+    policy.Until(lambda: driver.find_elements_by_xpath(results_xpath), action='result list', max_delay=max_delay)
+    if not driver.find_elements_by_xpath(next_page_xpath):
+        return False
+
+    def Click():
+        button = driver.find_element_by_xpath(next_page_xpath)
+        button.click()
+        return button
+    button = policy.Retry(Click, action='click next page', max_delay=max_delay)
+    policy.Until(lambda: IsStale(button), action='next page loaded', max_delay=max_delay)
+    return True
+
+
+def SkipCompleted(driver, checkpoint, policy, k=1, pages_per_range=2):
+    """
+    click 'Next Page' past the result pages (2 pages of 50 results per range) of all completed ranges, waiting for
+    each page before the next click (see NextPage); driver can be a selenium webdriver or any object with
+    find_elements_by_xpath / find_element_by_xpath returning elements with click() and is_enabled().
+    Returns the first missing range k
+    """
+    first_missing = checkpoint.FirstMissing(k)
+    for page in range((first_missing - k) * pages_per_range):
+        if not NextPage(driver, policy):
+            raise ValueError('checkpoint has {} ranges but the search has only {} result pages'.format(
+                first_missing - k, page + 1))
+    return first_missing
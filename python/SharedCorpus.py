@@ -0,0 +1,122 @@
+"""
+Bag-of-words corpus as three flat numpy arrays (term ids, counts, document offsets) in shared memory or in
+memory-mapped .npy files: pickling it only sends the segment names (or the folder), so the workers of a process
+pool attach to the same physical memory instead of each receiving a copy of corpus_nouns
+"""
+import os
+from multiprocessing import shared_memory
+import numpy
+import scipy.sparse
+
+arrays = (('ids', numpy.int32), ('counts', numpy.float32), ('offsets', numpy.int64))
+
+
+class SharedCorpus:
+    """
+    read-only gensim style corpus (len, indexing, iteration yield lists of (id, count)); create it with Create() in
+    the parent process, pass it to workers as argument, call Close() in every process and Unlink() once in the parent
+    """
+
+    def __init__(self, ids, counts, offsets, segments=None, path=None):
+        self.ids, self.counts, self.offsets = ids, counts, offsets
+        self.segments, self.path = segments, path
+
+    @classmethod
+    def Create(cls, corpus, path=None):
+        """
+        copy a bag-of-words corpus (any iterable, e.g. InternedBowCorpus) to shared memory, or to .npy files in
+        folder path if given (survive the process, can be opened with Open())
+        """
+        ids, counts, lengths = [], [], []
+        for bow in corpus:
+            bow = sorted(bow)
+            ids.append(numpy.fromiter((id for id, _ in bow), dtype=numpy.int32, count=len(bow)))
+            counts.append(numpy.fromiter((count for _, count in bow), dtype=numpy.float32, count=len(bow)))
+            lengths.append(len(bow))
+        data = {'ids': numpy.concatenate(ids) if ids else numpy.zeros(0, dtype=numpy.int32),
+                'counts': numpy.concatenate(counts) if counts else numpy.zeros(0, dtype=numpy.float32),
+                'offsets': numpy.append(0, numpy.cumsum(lengths, dtype=numpy.int64))}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            for name, _ in arrays:
+                numpy.save(os.path.join(path, name + '.npy'), data[name])
+            return cls.Open(path)
+        segments, views = {}, {}
+        for name, dtype in arrays:
+            segments[name] = shared_memory.SharedMemory(create=True, size=max(1, data[name].nbytes))
+            views[name] = numpy.ndarray(data[name].shape, dtype=dtype, buffer=segments[name].buf)
+            views[name][:] = data[name]
+        return cls(views['ids'], views['counts'], views['offsets'], segments=segments)
+
+    @classmethod
+    def Open(cls, path):
+        """
+        open a corpus saved with Create(corpus, path), arrays memory-mapped read-only
+        """
+        loaded = {name: numpy.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name, _ in arrays}
+        return cls(loaded['ids'], loaded['counts'], loaded['offsets'], path=path)
+
+    @classmethod
+    def Attach(cls, state):
+        """
+        attach to the shared memory segments described by state (from __getstate__)
+        """
+        segments, views = {}, {}
+        for name, dtype in arrays:
+            segment_name, shape = state[name]
+            segments[name] = shared_memory.SharedMemory(name=segment_name)
+            views[name] = numpy.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+            views[name].flags.writeable = False
+        return cls(views['ids'], views['counts'], views['offsets'], segments=segments)
+
+    def __getstate__(self):
+        if self.path is not None:
+            return {'path': self.path}
+        return {name: (self.segments[name].name, getattr(self, name).shape) for name, _ in arrays}
+
+    def __setstate__(self, state):
+        other = SharedCorpus.Open(state['path']) if 'path' in state else SharedCorpus.Attach(state)
+        self.__dict__.update(other.__dict__)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return list(zip(self.ids[start:end].tolist(), self.counts[start:end].tolist()))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def Chunk(self, start, end):
+        """
+        documents start to end as list (e.g. the share of one worker)
+        """
+        return [self[i] for i in range(start, min(end, len(self)))]
+
+    def ToSparse(self, num_terms):
+        """
+        scipy csr matrix (documents x terms) on top of the shared ids and counts, without copying them (only the
+        offsets are converted to int32 if possible); read-only, ids are sorted within each document
+        """
+        offsets = self.offsets.astype(numpy.int32) if len(self.ids) < 2 ** 31 else self.offsets
+        ids = self.ids if offsets.dtype == numpy.int32 else self.ids.astype(numpy.int64)
+        matrix = scipy.sparse.csr_matrix((self.counts, ids, offsets), shape=(len(self), num_terms), copy=False)
+        matrix.has_sorted_indices, matrix.has_canonical_format = True, True
+        return matrix
+
+    def Close(self):
+        """
+        release the arrays of this process
+        """
+        self.ids = self.counts = self.offsets = None
+        for segment in (self.segments or {}).values():
+            segment.close()
+
+    def Unlink(self):
+        """
+        free the shared memory (once, in the process which created it)
+        """
+        for segment in (self.segments or {}).values():
+            segment.unlink()
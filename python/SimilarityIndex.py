@@ -0,0 +1,98 @@
+"""
+"Articles like this one": top-k similarity search over the doc-topic matrix (Hellinger affinity, i.e. dot product of
+square-root topic distributions) or over L2-normalized TF-IDF vectors (cosine), computed as batched matrix products;
+the vectors are saved as .npy files and loaded memory-mapped
+"""
+import os
+import numpy
+import pandas
+import scipy.sparse
+from gensim.models import TfidfModel
+from python.LdaBackends import BowToSparse
+
+
+def TopK(scores, k):
+    """
+    column indices and values of the k largest scores per row, sorted descending
+    """
+    k = min(k, scores.shape[1])
+    top = numpy.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = numpy.take_along_axis(scores, top, axis=1)
+    order = numpy.argsort(-top_scores, axis=1, kind='stable')
+    return numpy.take_along_axis(top, order, axis=1), numpy.take_along_axis(top_scores, order, axis=1)
+
+
+class SimilarityIndex:
+    """
+    vectors (dense array or scipy csr matrix, one row per article) whose dot products are the similarities
+    """
+
+    def __init__(self, vectors, article_ids):
+        self.vectors, self.article_ids = vectors, numpy.asarray(article_ids)
+        self.position = {a: i for i, a in enumerate(self.article_ids.tolist())}
+
+    @classmethod
+    def FromDocTopics(cls, doc_topics, article_ids):
+        """
+        index over topic distributions (e.g. DocTopicMatrix()), similarity sum_k sqrt(p_k * q_k) in [0, 1]
+        """
+        return cls(numpy.sqrt(numpy.asarray(doc_topics, dtype=numpy.float32)), article_ids)
+
+    @classmethod
+    def FromTfidf(cls, corpus, dictionary, article_ids):
+        """
+        index over L2-normalized TF-IDF vectors of a bag-of-words corpus, similarity = cosine
+        """
+        tfidf = TfidfModel(dictionary=dictionary, normalize=True)
+        return cls(BowToSparse(tfidf[corpus], len(dictionary)), article_ids)
+
+    def __len__(self):
+        return len(self.article_ids)
+
+    def Query(self, queries, k=10, batch_size=64):
+        """
+        top-k positions and similarities for query vectors (rows in the same space as the index vectors)
+        """
+        positions, similarities = [], []
+        for start in range(0, queries.shape[0], batch_size):
+            scores = queries[start:start + batch_size] @ self.vectors.T
+            scores = scores.toarray() if scipy.sparse.issparse(scores) else numpy.asarray(scores)
+            top, top_scores = TopK(scores, k)
+            positions.append(top)
+            similarities.append(top_scores)
+        return numpy.vstack(positions), numpy.vstack(similarities)
+
+    def Similar(self, article_ids, k=10):
+        """
+        the k most similar articles of each given article (itself excluded) as long dataframe
+        """
+        rows = [self.position[a] for a in article_ids]
+        top, top_scores = self.Query(self.vectors[rows], k + 1)
+        result = []
+        for row, positions, scores in zip(rows, top, top_scores):
+            keep = positions != row
+            result.append(pandas.DataFrame({'Article_ID': self.article_ids[row],
+                                            'Similar_ID': self.article_ids[positions[keep][:k]],
+                                            'Similarity': scores[keep][:k]}))
+        return pandas.concat(result, ignore_index=True)
+
+    def Save(self, path):
+        os.makedirs(path, exist_ok=True)
+        numpy.save(os.path.join(path, 'article_ids.npy'), self.article_ids)
+        if scipy.sparse.issparse(self.vectors):
+            vectors = self.vectors.tocsr()
+            for name in ('data', 'indices', 'indptr'):
+                numpy.save(os.path.join(path, 'vectors_' + name + '.npy'), getattr(vectors, name))
+            numpy.save(os.path.join(path, 'vectors_shape.npy'), numpy.asarray(vectors.shape))
+        else:
+            numpy.save(os.path.join(path, 'vectors.npy'), self.vectors)
+
+    @classmethod
+    def Load(cls, path, mmap='r'):
+        article_ids = numpy.load(os.path.join(path, 'article_ids.npy'))
+        if os.path.isfile(os.path.join(path, 'vectors.npy')):
+            return cls(numpy.load(os.path.join(path, 'vectors.npy'), mmap_mode=mmap), article_ids)
+        parts = [numpy.load(os.path.join(path, 'vectors_' + name + '.npy'), mmap_mode=mmap)
+                 for name in ('data', 'indices', 'indptr')]
+        shape = tuple(numpy.load(os.path.join(path, 'vectors_shape.npy')).tolist())
+        return cls(scipy.sparse.csr_matrix(tuple(parts), shape=shape, copy=False), article_ids)
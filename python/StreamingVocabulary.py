@@ -0,0 +1,95 @@
+"""
+Build a filtered gensim dictionary in bounded memory: document frequencies are first estimated with a count-min sketch,
+only tokens which can reach no_below are counted exactly in a second pass. The result is the same dictionary as
+Dictionary(docs) followed by filter_extremes(), without materialising the long tail of rare tokens
+"""
+import numpy
+from gensim.corpora import Dictionary
+
+
+class CountMinSketch:
+    """
+    count-min sketch over 64-bit keys: depth rows of width counters; estimates never undercount, the overcount is at
+    most e/width * (total count) with probability 1 - exp(-depth)
+    """
+
+    def __init__(self, width=2 ** 20, depth=4, seed=0):
+        rng = numpy.random.RandomState(seed)
+        self.width, self.depth = width, depth
+        self.table = numpy.zeros((depth, width), dtype=numpy.uint32)
+        # multiply-shift hashing, one odd multiplier per row
+        self.a = rng.randint(1, 2 ** 62, size=depth, dtype=numpy.int64).astype(numpy.uint64) * 2 + 1
+        self.b = rng.randint(0, 2 ** 62, size=depth, dtype=numpy.int64).astype(numpy.uint64)
+
+    def _Index(self, keys):
+        keys = numpy.asarray(keys, dtype=numpy.uint64)
+        with numpy.errstate(over='ignore'):
+            return [((self.a[row] * keys + self.b[row]) >> numpy.uint64(32)) % numpy.uint64(self.width)
+                    for row in range(self.depth)]
+
+    def Add(self, keys):
+        for row, index in enumerate(self._Index(keys)):
+            numpy.add.at(self.table[row], index.astype(numpy.int64), 1)
+
+    def Estimate(self, keys):
+        return numpy.min([self.table[row][index.astype(numpy.int64)] for row, index in enumerate(self._Index(keys))],
+                         axis=0)
+
+
+def TokenKeys(tokens):
+    """
+    64-bit keys of tokens (python hash, stable within one process)
+    """
+    return numpy.fromiter((hash(token) & 0xFFFFFFFFFFFFFFFF for token in tokens), dtype=numpy.uint64,
+                          count=len(tokens))
+
+
+def StreamingFilterExtremes(docs, no_below=5, no_above=0.5, keep_n=100000, width=2 ** 20, depth=4):
+    """
+    same as dictionary = Dictionary(docs); dictionary.filter_extremes(no_below, no_above, keep_n), but with two passes
+    over docs (list of token lists or any re-iterable, or a function returning a new iterator of token lists for each
+    pass) and memory for the sketch (width*depth counters) plus the tokens whose estimated document frequency reaches
+    no_below; a larger width means less false candidates
+    """
+    if not callable(docs) and iter(docs) is docs:
+        raise TypeError('docs is a one-shot iterator, pass a list or a function which returns a new iterator per pass')
+    Docs = docs if callable(docs) else lambda: docs
+
+    # first pass: estimate document frequencies
+    sketch, num_docs, num_pos, num_nnz = CountMinSketch(width, depth), 0, 0, 0
+    for doc in Docs():
+        unique = set(doc)
+        sketch.Add(TokenKeys(list(unique)))
+        num_docs, num_pos, num_nnz = num_docs + 1, num_pos + len(doc), num_nnz + len(unique)
+
+    # second pass: exact counts of candidates, ids in the order Dictionary() would assign them
+    token2id, dfs, cfs = {}, [], []
+    for doc in Docs():
+        counts = {}
+        for token in doc:
+            counts[token] = counts.get(token, 0) + 1
+        tokens = list(counts)
+        candidates = [t for t, est in zip(tokens, sketch.Estimate(TokenKeys(tokens))) if est >= no_below]
+        for token in sorted(candidates):
+            id = token2id.get(token)
+            if id is None:
+                id = token2id[token] = len(dfs)
+                dfs.append(0)
+                cfs.append(0)
+            dfs[id] += 1
+            cfs[id] += counts[token]
+
+    # filter like Dictionary.filter_extremes()
+    no_above_abs = int(no_above * num_docs)
+    good_ids = [id for id in range(len(dfs)) if no_below <= dfs[id] <= no_above_abs]
+    if keep_n is not None:
+        good_ids = sorted(good_ids, key=lambda id: dfs[id], reverse=True)[:keep_n]
+    good_ids = sorted(good_ids)
+    id2token = {id: token for token, id in token2id.items()}
+
+    dictionary = Dictionary()
+    dictionary.token2id = {id2token[id]: new_id for new_id, id in enumerate(good_ids)}
+    dictionary.dfs = {new_id: dfs[id] for new_id, id in enumerate(good_ids)}
+    dictionary.cfs = {new_id: cfs[id] for new_id, id in enumerate(good_ids)}
+    dictionary.num_docs, dictionary.num_pos, dictionary.num_nnz = num_docs, num_pos, num_nnz
+    return dictionary
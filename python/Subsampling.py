@@ -0,0 +1,59 @@
+"""
+Stratified subsampling of the preprocessed articles for calibration runs: the sample keeps the distribution over
+date periods and newspapers of the full dataset and is reproducible (same random_state, same sample), so parameter
+exploration can run on a few percent of the corpus
+"""
+import numpy
+import pandas
+from python.ProcessingFunctions import MakeListInLists
+from python.Vocabulary import InternedCorpus
+
+
+def StratifiedSample(df, fraction=0.05, date_col='Date', freq='Y', strata_cols=('Newspaper',), min_per_stratum=1,
+                     random_state=203495):
+    """
+    draw fraction of the rows of df from every stratum (date period of frequency freq, e.g. 'Y', 'Q', 'M', times the
+    values of strata_cols which exist in df), at least min_per_stratum rows per stratum; rows keep their order
+    """
+    keys = [pandas.to_datetime(df[date_col]).dt.to_period(freq).astype(str).values]
+    keys += [df[col].fillna('').values for col in strata_cols if col in df.columns]
+    priority = numpy.random.RandomState(random_state).random_sample(len(df))
+    keep = []
+    for rows in pandas.DataFrame(dict(enumerate(keys))).groupby(list(range(len(keys))), sort=True).indices.values():
+        n = min(len(rows), max(min_per_stratum, int(round(fraction * len(rows)))))
+        keep.append(rows[numpy.argsort(priority[rows], kind='stable')[:n]])
+    keep = numpy.sort(numpy.concatenate(keep)) if keep else numpy.zeros(0, dtype=numpy.int64)
+    return df.iloc[keep]
+
+
+def StrataShares(df, date_col='Date', freq='Y', strata_cols=('Newspaper',)):
+    """
+    share of rows per stratum, to compare a sample with the full dataset
+    """
+    keys = [pandas.to_datetime(df[date_col]).dt.to_period(freq).rename('Period')]
+    keys += [df[col] for col in strata_cols if col in df.columns]
+    return df.groupby(keys).size() / len(df)
+
+
+def SampleCorpus(df, fraction=0.05, tokens_col='Nouns_lemma', no_below=20, no_above=0.2, **sample_args):
+    """
+    stratified sample of df with the matching filtered dictionary and bag-of-words corpus; no_below is given for the
+    full dataset and scaled down with fraction (at least 2 documents), no_above is relative and stays the same.
+    Returns df_sample, dictionary, corpus, texts
+    """
+    df_sample = StratifiedSample(df, fraction, **sample_args)
+    texts = MakeListInLists(df_sample[tokens_col])
+    interned = InternedCorpus.FromLists(texts)
+    dictionary = interned.ToDictionary()
+    dictionary.filter_extremes(no_below=max(2, int(round(no_below * fraction))), no_above=no_above)
+    return df_sample, dictionary, interned.Bow(dictionary), texts
+
+
+if __name__ == '__main__':
+    from python.ConfigUser import path_processedarticles
+
+    # write a 5% calibration sample next to the full export of PreprocessingTrunk.py / PreprocessingArticles.py
+    df_articles = pandas.read_csv(path_processedarticles + 'articles_for_lda_analysis.csv', sep='\t')
+    df_sample = StratifiedSample(df_articles, fraction=0.05)
+    df_sample.to_csv(path_processedarticles + 'articles_for_lda_analysis_sample.csv', sep='\t', index=False)
+    print('sampled {} of {} articles'.format(len(df_sample), len(df_articles)))
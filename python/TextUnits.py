@@ -0,0 +1,109 @@
+"""
+Long-format storage of sentences and paragraphs: one flat (article_id, seq, text) table with offset arrays instead
+of python lists in dataframe cells, and an apply-per-unit API for the list based Sentence* functions
+"""
+import numpy
+import pandas
+
+
+class TextUnits:
+    """
+    flat representation of the text units (sentences, paragraphs) of all articles;
+    units are sorted by (article_id, seq), units of the i-th article are text[offsets[i]:offsets[i+1]]
+    """
+
+    def __init__(self, article_id, seq, text):
+        article_id, seq = numpy.asarray(article_id, dtype=numpy.int64), numpy.asarray(seq, dtype=numpy.int64)
+        if not len(article_id) == len(seq) == len(text):
+            raise ValueError('article_id, seq and text must have the same length')
+        order = numpy.lexsort((seq, article_id))
+        self.article_id, self.seq = article_id[order], seq[order]
+        self.text = [text[i] for i in order]
+        self.article_ids, starts = numpy.unique(self.article_id, return_index=True)
+        self.offsets = numpy.append(starts, len(self.article_id)).astype(numpy.int64)
+
+    @classmethod
+    def FromFrame(cls, df, id_col='Art_ID', seq_col='Par_ID', text_col='Paragraph'):
+        """
+        build from a long dataframe with one row per unit, e.g. the paragraphs file from ProcessNexisArticles.R
+        """
+        return cls(df[id_col].to_numpy(), df[seq_col].to_numpy(), df[text_col].tolist())
+
+    @classmethod
+    def FromLists(cls, article_ids, listOfLists):
+        """
+        build from a list of lists (one list of units per article), e.g. the output of Sentencizer()
+        """
+        lengths = numpy.fromiter((len(x) for x in listOfLists), dtype=numpy.int64, count=len(listOfLists))
+        article_id = numpy.repeat(numpy.asarray(article_ids, dtype=numpy.int64), lengths)
+        seq = numpy.arange(lengths.sum()) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths) + 1
+        return cls(article_id, seq, [unit for units in listOfLists for unit in units])
+
+    def __len__(self):
+        return len(self.text)
+
+    def _Replace(self, text, keep=None):
+        new = TextUnits.__new__(TextUnits)
+        if keep is None:
+            new.article_id, new.seq, new.text = self.article_id, self.seq, text
+            new.article_ids, new.offsets = self.article_ids, self.offsets
+            return new
+        new.article_id, new.seq = self.article_id[keep], self.seq[keep]
+        new.text = [t for t, k in zip(text, keep) if k]
+        new.article_ids, starts = numpy.unique(new.article_id, return_index=True)
+        new.offsets = numpy.append(starts, len(new.article_id)).astype(numpy.int64)
+        return new
+
+    def Apply(self, func, *args, **kwargs):
+        """
+        call a list based function (e.g. SentenceCleaner, SentencePOStagger) once on all units;
+        func has to return one element per unit
+        """
+        text = func(self.text, *args, **kwargs)
+        if len(text) != len(self.text):
+            raise ValueError('{} returned {} units for {} input units'.format(func.__name__, len(text), len(self)))
+        return self._Replace(list(text))
+
+    def Map(self, func, *args, **kwargs):
+        """
+        call a function on each single unit (e.g. NormalizeWords, DateRemover)
+        """
+        return self._Replace([func(x, *args, **kwargs) for x in self.text])
+
+    def Filter(self, mask):
+        """
+        keep only units where mask is True
+        """
+        return self._Replace(self.text, keep=numpy.asarray(mask, dtype=bool))
+
+    def CutFrom(self, mask):
+        """
+        drop all units of an article from the first unit where mask is True onwards (vectorized ParagraphSplitter)
+        """
+        hit = pandas.Series(numpy.asarray(mask, dtype=bool)).groupby(self.article_id).cummax().to_numpy()
+        return self.Filter(~hit)
+
+    def SelectArticles(self, article_ids):
+        """
+        keep only units of the given articles
+        """
+        return self.Filter(numpy.isin(self.article_id, numpy.asarray(article_ids, dtype=numpy.int64)))
+
+    def ToLists(self, article_ids=None):
+        """
+        list of units per article (in the order of article_ids, empty list if an article has no units left)
+        """
+        position = {a: i for i, a in enumerate(self.article_ids.tolist())}
+        if article_ids is None:
+            article_ids = self.article_ids.tolist()
+        listOfLists = []
+        for a in article_ids:
+            i = position.get(a)
+            listOfLists.append([] if i is None else self.text[self.offsets[i]:self.offsets[i + 1]])
+        return listOfLists
+
+    def ToFrame(self, text_col='Text'):
+        """
+        long dataframe with one row per unit
+        """
+        return pandas.DataFrame({'Article_ID': self.article_id, 'Seq': self.seq, text_col: self.text})
@@ -0,0 +1,169 @@
+"""
+Interning of lemma streams on the LDA side: the exported lemma lists are mapped to int32 ids once when they are read
+in (LDAArticles.py, LDASentences.py) and documents are stored as one flat id array with offsets, which can be turned
+into a gensim dictionary and bag-of-words corpus without going back to strings
+"""
+import numpy
+from gensim.corpora import Dictionary
+
+
+class Vocabulary:
+    """
+    maps tokens to consecutive int32 ids (and back); a frozen vocabulary keeps its tokens and Intern() drops
+    unknown tokens
+    """
+
+    def __init__(self, tokens=(), frozen=False):
+        self.token2id, self.id2token = {}, []
+        for token in tokens:
+            self.Id(token)
+        self.frozen = frozen
+
+    @classmethod
+    def FromDictionary(cls, dictionary):
+        """
+        frozen vocabulary with the ids of a gensim dictionary (e.g. from StreamingFilterExtremes()), so only the
+        tokens of the filtered dictionary are interned
+        """
+        return cls((dictionary[id] for id in range(len(dictionary))), frozen=True)
+
+    def __len__(self):
+        return len(self.id2token)
+
+    def Id(self, token):
+        """
+        return id of token, add token if not known yet
+        """
+        id = self.token2id.get(token)
+        if id is None:
+            id = self.token2id[token] = len(self.id2token)
+            self.id2token.append(token)
+        return id
+
+    def Intern(self, tokens):
+        """
+        convert a list of tokens to an int32 array of ids (without the unknown tokens if the vocabulary is frozen)
+        """
+        if self.frozen:
+            ids = (self.token2id.get(token) for token in tokens)
+            return numpy.fromiter((id for id in ids if id is not None), dtype=numpy.int32)
+        return numpy.fromiter((self.Id(token) for token in tokens), dtype=numpy.int32)
+
+    def Lookup(self, ids):
+        """
+        convert ids back to tokens (for display only)
+        """
+        return [self.id2token[id] for id in ids]
+
+
+class InternedCorpus:
+    """
+    documents as one flat int32 id array; document i is ids[offsets[i]:offsets[i+1]]
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._chunks, self._lengths, self._offsets = [], [], None
+
+    @classmethod
+    def FromLists(cls, listOfLists, vocabulary=None):
+        """
+        intern list of token lists, e.g. noun_lemma_list from PreprocessingArticles.py
+        """
+        corpus = cls(vocabulary)
+        for doc in listOfLists:
+            corpus.Add(doc)
+        return corpus
+
+    def Add(self, doc):
+        """
+        add a document, either a list of tokens or an array of ids from Vocabulary.Intern()
+        """
+        if not isinstance(doc, numpy.ndarray):
+            doc = self.vocabulary.Intern(doc)
+        self._chunks.append(doc.astype(numpy.int32, copy=False))
+        self._lengths.append(len(doc))
+        self._offsets = None
+
+    @property
+    def ids(self):
+        if len(self._chunks) != 1:
+            self._chunks = [numpy.concatenate(self._chunks) if self._chunks else numpy.zeros(0, dtype=numpy.int32)]
+        return self._chunks[0]
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            self._offsets = numpy.concatenate(([0], numpy.cumsum(self._lengths, dtype=numpy.int64)))
+        return self._offsets
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def Document(self, i):
+        offsets = self.offsets
+        return self.ids[offsets[i]:offsets[i + 1]]
+
+    def DocumentFrequencies(self):
+        """
+        number of documents (dfs) and total occurrences (cfs) per vocabulary id
+        """
+        ids, size = self.ids.astype(numpy.int64), len(self.vocabulary)
+        docs = numpy.repeat(numpy.arange(len(self), dtype=numpy.int64), self._lengths)
+        unique_pairs = numpy.unique(docs * size + ids)
+        dfs = numpy.bincount(unique_pairs % size, minlength=size) if size else numpy.zeros(0, dtype=numpy.int64)
+        cfs = numpy.bincount(ids, minlength=size) if size else numpy.zeros(0, dtype=numpy.int64)
+        return dfs, cfs, len(unique_pairs)
+
+    def ToDictionary(self):
+        """
+        gensim Dictionary with the same ids and statistics as Dictionary(listOfLists), ready for filter_extremes()
+        """
+        dfs, cfs, num_nnz = self.DocumentFrequencies()
+        # gensim numbers new tokens by first document, alphabetically within a document
+        first_doc = numpy.full(len(self.vocabulary), len(self), dtype=numpy.int64)
+        numpy.minimum.at(first_doc, self.ids, numpy.repeat(numpy.arange(len(self), dtype=numpy.int64), self._lengths))
+        id2token = self.vocabulary.id2token
+        order = sorted(numpy.flatnonzero(dfs).tolist(), key=lambda i: (first_doc[i], id2token[i]))
+        dictionary = Dictionary()
+        dictionary.token2id = {id2token[i]: id for id, i in enumerate(order)}
+        dfs, cfs = dfs.tolist(), cfs.tolist()
+        dictionary.dfs = {id: dfs[i] for id, i in enumerate(order)}
+        dictionary.cfs = {id: cfs[i] for id, i in enumerate(order)}
+        dictionary.num_docs, dictionary.num_pos, dictionary.num_nnz = len(self), len(self.ids), num_nnz
+        return dictionary
+
+    def Bow(self, dictionary):
+        """
+        bag-of-words corpus for a (filtered) gensim dictionary
+        """
+        return InternedBowCorpus(self, dictionary)
+
+
+class InternedBowCorpus:
+    """
+    iterable bag-of-words corpus on top of an InternedCorpus; ids are mapped to the dictionary ids with an array
+    """
+
+    def __init__(self, corpus, dictionary):
+        self.corpus = corpus
+        self.remap = numpy.full(len(corpus.vocabulary), -1, dtype=numpy.int32)
+        for token, id in dictionary.token2id.items():
+            vocab_id = corpus.vocabulary.token2id.get(token)
+            if vocab_id is not None:
+                self.remap[vocab_id] = id
+
+    def __len__(self):
+        return len(self.corpus)
+
+    def __getitem__(self, i):
+        ids = self.remap[self.corpus.Document(i)]
+        ids, counts = numpy.unique(ids[ids >= 0], return_counts=True)
+        return list(zip(ids.tolist(), counts.tolist()))
+
+    def __iter__(self):
+        ids_all, offsets = self.remap[self.corpus.ids], self.corpus.offsets
+        for i in range(len(self.corpus)):
+            ids = ids_all[offsets[i]:offsets[i + 1]]
+            ids, counts = numpy.unique(ids[ids >= 0], return_counts=True)
+            yield list(zip(ids.tolist(), counts.tolist()))
@@ -0,0 +1,90 @@
+"""
+Condition based waits and retries with exponential backoff for page interactions (GetNexis.py): instead of fixed
+sleeps an action is retried / a condition is polled with growing delays until it succeeds, up to a max. number of
+attempts; timing statistics are collected per action
+"""
+import time
+
+
+class WaitPolicy:
+    """
+    retry with delays initial, initial*factor, ... (at most max_delay) and give up after max_attempts;
+    exceptions lists the exception types which count as 'not yet' (e.g. selenium's WebDriverException)
+    """
+
+    def __init__(self, initial=0.05, factor=2., max_delay=3., max_attempts=50, exceptions=(Exception,),
+                 sleep=time.sleep, clock=time.monotonic):
+        self.initial, self.factor, self.max_delay, self.max_attempts = initial, factor, max_delay, max_attempts
+        self.exceptions, self.sleep, self.clock = tuple(exceptions), sleep, clock
+        self.stats = {}
+
+    def Delays(self, max_delay=None):
+        """
+        sequence of delays between the attempts
+        """
+        max_delay = self.max_delay if max_delay is None else max_delay
+        delay = self.initial
+        for _ in range(self.max_attempts - 1):
+            yield min(delay, max_delay)
+            delay *= self.factor
+
+    def _Record(self, action, attempts, duration, success):
+        stats = self.stats.setdefault(action, {'calls': 0, 'attempts': 0, 'failures': 0, 'total_time': 0.,
+                                               'max_time': 0.})
+        stats['calls'] += 1
+        stats['attempts'] += attempts
+        stats['failures'] += not success
+        stats['total_time'] += duration
+        stats['max_time'] = max(stats['max_time'], duration)
+
+    def _Run(self, func, action, max_delay, exceptions):
+        start, delays, attempts = self.clock(), self.Delays(max_delay), 0
+        while True:
+            attempts += 1
+            try:
+                result = func()
+            except exceptions:
+                delay = next(delays, None)
+                if delay is None:
+                    self._Record(action, attempts, self.clock() - start, False)
+                    raise
+                self.sleep(delay)
+            else:
+                self._Record(action, attempts, self.clock() - start, True)
+                return result
+
+    def Retry(self, func, action='action', max_delay=None):
+        """
+        call func until it does not raise one of the exceptions, return its result;
+        re-raises the last exception after max_attempts
+        """
+        return self._Run(func, action, max_delay, self.exceptions)
+
+    def Until(self, condition, action='wait', max_delay=None):
+        """
+        poll condition until it returns a true value (exceptions count as false) and return the value;
+        raises TimeoutError after max_attempts
+        """
+        def Check():
+            value = condition()
+            if not value:
+                raise _NotYet()
+            return value
+        try:
+            return self._Run(Check, action, max_delay, self.exceptions + (_NotYet,))
+        except _NotYet:
+            raise TimeoutError('{} not fulfilled after {} attempts'.format(action, self.max_attempts)) from None
+
+    def Report(self):
+        """
+        one line per action: calls, attempts, failures, total and max. time
+        """
+        lines = []
+        for action, s in sorted(self.stats.items(), key=lambda kv: -kv[1]['total_time']):
+            lines.append('{}: {} calls, {} attempts, {} failures, {:.1f}s total, {:.1f}s max'.format(
+                action, s['calls'], s['attempts'], s['failures'], s['total_time'], s['max_time']))
+        return '\n'.join(lines)
+
+
+class _NotYet(Exception):
+    pass
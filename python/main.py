@@ -2,10 +2,22 @@
 Run preprocessing from here, adjust configurations for lda, for calibration
 """
 
-from python.preprocessingSentences
-# from python.preprocessingArticles import noun_lemma_list, noun_list
+# import python.PreprocessingTrunk  (PreprocessingArticles.py, -Sentences.py and -Paragraphs.py run the same trunk)
+# from python.PreprocessingArticles import noun_lemma_list
 
 
+# Calibration: fraction of articles (stratified by year and newspaper, see Subsampling.py) used in LDAArticles.py,
+# None for the full corpus
+calibration_fraction = None
+
+# Excel reports of the preprocessing scripts (see ReportExport.py): switch off or cap the number of rows
+export_excel = True
+excel_max_rows = 10000
+
+# Choice of num_topics in LDAArticles.py: successive halving (see ModelSelection.py), or True for the exhaustive
+# coherence sweep which trains every candidate on the full corpus
+exhaustive_topic_sweep = False
+
 # TODO: add parameters as dictionary
 # Filter out words that occur less than 20 documents, or more than 50% of the documents
 # dict_nouns.filter_extremes(no_below=20, no_above=0.2)